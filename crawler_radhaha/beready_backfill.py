@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""
+beready_backfill.py
+- 게시판 목록을 페이지 단위로 넘기며 모든 식단표 글을 모아 한꺼번에 저장 (DB 초기화 후 복구, 과거 데이터 수집용)
+- 상세 글은 스레드풀로 동시에 받되, 동시 요청 수(--concurrency)와 요청 간 최소 간격(--delay)을 지킴
+- 파싱 결과는 --batch 행씩 모아 db.ingest로 bulk 저장 (이미 있는 행은 건너뜀)
+- 글 하나를 받아 켜져 있는 source(끼니)마다 파싱 (--source로 지정 가능)
+
+    python -m crawler_radhaha.beready_backfill --max-pages 30 --concurrency 4 --delay 0.5
+
+    # 로컬 대역 서버 (저장해 둔 페이지로 주마다 다른 글을 만들어 냄, pageIndex 지원)
+    python -m crawler_radhaha.beready_fixture_server --posts 60 --port 8399
+    python -m crawler_radhaha.beready_backfill --list-url http://127.0.0.1:8399/main/399 --max-pages 10
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional
+from urllib.parse import urlencode, urlsplit, urlunsplit, parse_qsl
+
+from crawler_radhaha.beready_crawler import LIST_URL, fetch_html, find_view_urls
+from crawler_radhaha.beready_sources import SOURCES, MenuSource, enabled_sources
+from crawler_radhaha.db import init_db, ingest
+
+PAGE_PARAM = "pageIndex"  # PKNU 게시판 페이지 번호 파라미터
+
+
+class RateLimiter:
+    """요청 시작 간격을 delay초 이상으로 유지 (모든 작업 스레드가 공유)"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.delay
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def page_url(list_url: str, page: int, param: str = PAGE_PARAM) -> str:
+    parts = urlsplit(list_url)
+    query = dict(parse_qsl(parts.query))
+    query[param] = str(page)
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def collect_view_urls(list_url: str, max_pages: int, limiter: RateLimiter, param: str = PAGE_PARAM) -> List[str]:
+    """1페이지부터 차례로, 새 글 링크가 하나도 안 나오는 페이지에서 멈춤"""
+    urls: dict = {}
+    for page in range(1, max_pages + 1):
+        limiter.wait()
+        try:
+            found = find_view_urls(fetch_html(page_url(list_url, page, param)), list_url)
+        except Exception as e:
+            print(f"[WARN] list page {page} failed: {e}")
+            break
+        new = [u for u in found if u not in urls]
+        if not new:
+            break
+        for u in new:
+            urls[u] = None
+        print(f"[LIST] page {page}: +{len(new)} (total {len(urls)})")
+    return list(urls)
+
+
+def _fetch_and_parse(url: str, limiter: RateLimiter, sources: List[MenuSource]) -> Optional[List[tuple]]:
+    """글 하나 → [(day, dish, date_iso, source)], 어느 source의 표도 없으면 None"""
+    limiter.wait()
+    html = fetch_html(url)
+    items, found = [], False
+    for src in sources:
+        rows = src.parse(html)
+        if rows is not None:
+            found = True
+            items.extend((day, dish, d, src.name) for day, dish, d in rows)
+    return items if found else None
+
+
+def backfill(list_url: str = LIST_URL, max_pages: int = 50, concurrency: int = 4, delay: float = 0.5,
+             batch: int = 500, param: str = PAGE_PARAM, sources: Optional[List[MenuSource]] = None) -> dict:
+    sources = sources or enabled_sources()
+    init_db()
+    limiter = RateLimiter(delay)
+    started = time.perf_counter()
+    view_urls = collect_view_urls(list_url, max_pages, limiter, param)
+
+    stats = {"posts": len(view_urls), "parsed": 0, "no_table": 0, "failed": 0, "rows": 0, "added": 0}
+    pending: List[tuple] = []
+
+    def flush():
+        if pending:
+            stats["added"] += ingest(pending).added
+            pending.clear()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = {pool.submit(_fetch_and_parse, u, limiter, sources): u for u in view_urls}
+        for fut in as_completed(futures):
+            try:
+                items = fut.result()
+            except Exception as e:
+                stats["failed"] += 1
+                print(f"[WARN] {futures[fut]} failed: {e}")
+                continue
+            if items is None:
+                stats["no_table"] += 1
+                continue
+            stats["parsed"] += 1
+            stats["rows"] += len(items)
+            pending.extend(items)
+            if len(pending) >= batch:
+                flush()
+    flush()
+
+    stats["seconds"] = round(time.perf_counter() - started, 2)
+    return stats
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="backfill every menu post from the board")
+    ap.add_argument("--list-url", default=LIST_URL)
+    ap.add_argument("--page-param", default=PAGE_PARAM)
+    ap.add_argument("--max-pages", type=int, default=50)
+    ap.add_argument("--concurrency", type=int, default=4)
+    ap.add_argument("--delay", type=float, default=0.5, help="min seconds between request starts")
+    ap.add_argument("--batch", type=int, default=500, help="rows per bulk write")
+    ap.add_argument("--source", action="append", choices=sorted(SOURCES),
+                    help="source to parse from each post (repeatable, default: BEREADY_SOURCES)")
+    args = ap.parse_args(argv)
+
+    sources = [SOURCES[n] for n in args.source] if args.source else None
+    stats = backfill(args.list_url, args.max_pages, args.concurrency, args.delay, args.batch, args.page_param, sources)
+    print(f"[DONE] {stats}")
+
+
+if __name__ == "__main__":
+    main()
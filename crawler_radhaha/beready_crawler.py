@@ -5,22 +5,40 @@
 """
 beready_crawler.py
 - PKNU 라일락 주간식단표 크롤러
-- 목록에서 최신 글 → 상세 표에서 '중식' 5일치 파싱 → core.upsert로 DB 저장
+- 목록에서 최신 글 → 상세 표에서 '중식' 5일치 파싱 → db.ingest로 DB 저장(새 행만)
+- 식당/끼니별 설정은 beready_sources (crawl_once는 켜져 있는 source를 모두 한 번에 처리)
 """
 
+import os
 import re
-from typing import List, Tuple, Optional, Dict
+import hashlib
+import threading
+from typing import List, Tuple, Optional, Dict, NamedTuple
 from urllib.parse import urljoin
 
 import requests
-from bs4 import BeautifulSoup, Tag
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer, Tag
 
-from crawler_radhaha.db import init_db, upsert
+from crawler_radhaha.db import get_repository
+from crawler_radhaha.beready_dates import extract_post_date, resolve_label_date
 # db.py 추가하면서 새로 추가 #
 
 # from crawler_radhaha.beready_crawler_core import (init_db, upsert)  # DB는 core 모듈 사용 - 주석처리 #
 
-LIST_URL = "https://www.pknu.ac.kr/main/399"
+LIST_URL = os.getenv("BEREADY_LIST_URL", "https://www.pknu.ac.kr/main/399")  # 로컬 대역: beready_fixture_server
+
+# lxml이 있으면 사용 (html.parser보다 몇 배 빠름), 없으면 기본 파서
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+# 페이지 전체 대신 필요한 태그만 트리로 만듦
+ONLY_TABLES = SoupStrainer("table")
+ONLY_VIEW_LINKS = SoupStrainer("a", href=re.compile(r"action=view"))
 
 HEADERS = {
     "User-Agent": (
@@ -33,33 +51,103 @@ HEADERS = {
 }
 
 # ---------------- HTTP ----------------
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+def get_session() -> requests.Session:
+    """프로세스 전체가 공유하는 Session (keep-alive 커넥션 풀 + 재시도)"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                s = requests.Session()
+                s.headers.update(HEADERS)
+                retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                              allowed_methods=("GET", "HEAD"))
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+                s.mount("https://", adapter)
+                s.mount("http://", adapter)
+                _session = s
+    return _session
+
 def fetch_html(url: str) -> str:
-    r = requests.get(url, headers=HEADERS, timeout=20)
+    r = get_session().get(url, timeout=20)
     r.raise_for_status()
     r.encoding = r.apparent_encoding or r.encoding
     return r.text
 
+class Page(NamedTuple):
+    url: str
+    text: Optional[str]  # 바뀌지 않았으면 None
+    changed: bool
+    validators: Dict[str, Optional[str]]  # 다음 요청에 쓸 etag / last_modified / sha256
+
+def fetch_if_changed(url: str) -> Page:
+    """
+    지난번에 저장한 ETag/Last-Modified로 조건부 GET.
+    304이거나 본문 해시가 같으면 changed=False (본문 디코딩/파싱 생략).
+    성공적으로 처리한 뒤 remember(page)를 불러야 다음 번에 건너뜀.
+    """
+    meta = get_repository().get_meta(f"http:{url}") or {}
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+
+    r = get_session().get(url, headers=headers, timeout=20)
+    if r.status_code == 304:
+        return Page(url, None, False, meta)
+    r.raise_for_status()
+
+    validators = {
+        "etag": r.headers.get("ETag"),
+        "last_modified": r.headers.get("Last-Modified"),
+        "sha256": hashlib.sha256(r.content).hexdigest(),
+    }
+    if validators["sha256"] == meta.get("sha256"):
+        return Page(url, None, False, validators)
+    r.encoding = r.apparent_encoding or r.encoding
+    return Page(url, r.text, True, validators)
+
+def remember(page: Page):
+    get_repository().set_meta(f"http:{page.url}", page.validators)
+
 # ------------- 목록 → 최신 글 URL -------------
 def find_latest_view_url(list_html: str, base_url: str) -> Optional[str]:
-    soup = BeautifulSoup(list_html, "html.parser")
-    a = soup.select_one("td.title a[href*='action=view']")
+    # 앞의 두 선택자는 표 안에서만 찾으므로 표만 파싱
+    tables = BeautifulSoup(list_html, HTML_PARSER, parse_only=ONLY_TABLES)
+    a = tables.select_one("td.title a[href*='action=view']")
     if a and a.get("href"):
         return urljoin(base_url, a["href"])
-    a = soup.select_one("table a[href*='action=view']")
+    a = tables.select_one("table a[href*='action=view']")
     if a and a.get("href"):
         return urljoin(base_url, a["href"])
-    a = soup.select_one("a[href*='action=view']")
+    # 표 밖 링크까지: 상세 링크만 파싱
+    links = BeautifulSoup(list_html, HTML_PARSER, parse_only=ONLY_VIEW_LINKS)
+    a = links.find("a")
     if a and a.get("href"):
         return urljoin(base_url, a["href"])
     return None
 
+def find_view_urls(list_html: str, base_url: str) -> List[str]:
+    """목록 페이지의 모든 상세 글 URL (페이지 순서대로, 중복 제거) - 백필용"""
+    links = BeautifulSoup(list_html, HTML_PARSER, parse_only=ONLY_VIEW_LINKS)
+    seen: Dict[str, None] = {}
+    for a in links.find_all("a"):
+        if a.get("href"):
+            seen.setdefault(urljoin(base_url, a["href"]), None)
+    return list(seen)
+
 # ------------- 상세: 라일락 표 찾기 -------------
 WEEK_EN  = {"Monday", "Tuesday", "Wednesday", "Thursday", "Friday"}
 DATE_PAT = re.compile(r"\d{1,2}\s*월\s*\d{1,2}\s*일")
 
-def find_lilac_table(view_html: str) -> Optional[Tag]:
-    soup = BeautifulSoup(view_html, "html.parser")
-    t = soup.select_one("table.con03_sub_2")
+LILAC_TABLE = "table.con03_sub_2"
+
+def find_lilac_table(view_html: str, selector: str = LILAC_TABLE) -> Optional[Tag]:
+    soup = BeautifulSoup(view_html, HTML_PARSER, parse_only=ONLY_TABLES)
+    t = soup.select_one(selector)
     if t:
         return t
     for table in soup.find_all("table"):
@@ -91,38 +179,43 @@ def squash_slash(lines: List[str]) -> List[str]:
         i += 1
     return out
 
-def pick_5_header(cells: List[Tag]) -> List[Tag]:
+def pick_5_header(texts: List[str]) -> List[str]:
     picked = []
-    for c in cells:
-        tx = cell_text(c)
+    for tx in texts:
         if not tx or "구분" in tx or "운영정보" in tx:
             continue
-        picked.append(c)
+        picked.append(tx)
         if len(picked) == 5:
             break
     return picked
 
-def pick_5_dates(cells: List[Tag]) -> List[Tag]:
-    cleaned = [c for c in cells if "운영정보" not in cell_text(c)]
+def pick_5_dates(texts: List[str]) -> List[str]:
+    cleaned = [tx for tx in texts if "운영정보" not in tx]
     return cleaned[:5]
 
-# ------------- 표 파싱 (중식 5일): 수정시 따로 HTML 뽑아서 확인 필수-------------
+def row_texts(tr: Tag) -> List[str]:
+    """행의 셀 텍스트를 한 번만 계산"""
+    return [cell_text(c) for c in tr.find_all(["th", "td"])]
+
+# ------------- 표 파싱 (끼니별 5일): 수정시 따로 HTML 뽑아서 확인 필수-------------
 def parse_lunch_from_table(table: Tag) -> List[Tuple[str, str]]:
+    # 중식 행을 못 찾으면 예전처럼 세 번째 행을 중식으로 봄
+    return parse_meal_from_table(table, "중식", fallback_first_row=True)
+
+def parse_meal_from_table(table: Tag, meal: str, fallback_first_row: bool = False) -> List[Tuple[str, str]]:
+    """meal: 왼쪽 구분 칸에 적힌 끼니 이름 (조식/중식/석식)"""
     rows_out: List[Tuple[str, str]] = []
     trs = table.find_all("tr")
     if len(trs) < 3:
         return rows_out
 
-    h1 = trs[0].find_all(["th", "td"])
-    h2 = trs[1].find_all(["th", "td"])
-
-    day_cells  = pick_5_header(h1)
-    date_cells = pick_5_dates(h2)
+    day_texts  = pick_5_header(row_texts(trs[0]))
+    date_texts = pick_5_dates(row_texts(trs[1]))
 
     labels: List[str] = []
     for i in range(5):
-        d_txt = cell_text(date_cells[i]) if i < len(date_cells) else ""
-        w_txt = cell_text(day_cells[i])  if i < len(day_cells)  else ""
+        d_txt = date_texts[i] if i < len(date_texts) else ""
+        w_txt = day_texts[i]  if i < len(day_texts)  else ""
         if d_txt and w_txt and w_txt not in d_txt:
             labels.append(f"{d_txt} ({w_txt})")
         elif d_txt:
@@ -132,30 +225,31 @@ def parse_lunch_from_table(table: Tag) -> List[Tuple[str, str]]:
         else:
             labels.append(f"Day{i+1}")
 
-    lunch_tr = None
+    # 끼니 행 찾기: 앞의 두 칸만 보면 되므로 그 두 칸만 텍스트 계산
+    meal_tr = None
     for tr in trs[2:]:
-        first_two = tr.find_all(["th", "td"])[:2]
-        left_text = " ".join(cell_text(c) for c in first_two)
-        if "중식" in left_text:
-            lunch_tr = tr
+        first_two = tr.find_all(["th", "td"], limit=2)
+        if meal in " ".join(cell_text(c) for c in first_two):
+            meal_tr = tr
             break
-    if not lunch_tr:
-        lunch_tr = trs[2]
+    if not meal_tr:
+        if not fallback_first_row:
+            return rows_out
+        meal_tr = trs[2]
 
-    tds = lunch_tr.find_all(["th", "td"])
+    texts = row_texts(meal_tr)
     skip = 0
-    for i, c in enumerate(tds[:2]):
-        if "구분" in cell_text(c) or "중식" in cell_text(c):
+    for i, tx in enumerate(texts[:2]):
+        if "구분" in tx or meal in tx:
             skip = i + 1
     if skip == 0:
         skip = 1
-    candidates = [c for c in tds[skip:] if "운영정보" not in cell_text(c)]
-    menu_cells = candidates[:5]
+    candidates = [tx for tx in texts[skip:] if "운영정보" not in tx]
+    menu_texts = candidates[:5]
 
     ban_words = ("운영", "문의", "전화", "Open", "Close")
-    for i, cell in enumerate(menu_cells):
+    for i, raw in enumerate(menu_texts):
         day = labels[i] if i < len(labels) else f"Day{i+1}"
-        raw = cell_text(cell)
         lines = [ln.strip() for ln in raw.split("\n") if ln.strip()]
         lines = [ln for ln in lines if not any(b in ln for b in ban_words)]
         lines = squash_slash(lines)
@@ -164,39 +258,40 @@ def parse_lunch_from_table(table: Tag) -> List[Tuple[str, str]]:
 
     return rows_out
 
+# ------------- 라벨 → 실제 날짜 -------------
+def attach_dates(items: List[Tuple[str, str]], view_html: str) -> List[Tuple[str, str, Optional[str]]]:
+    """
+    (day, dish) → (day, dish, 'YYYY-MM-DD')
+    연도는 게시글에 적힌 날짜(없으면 오늘)를 기준으로, 라벨의 요일과 맞는 해를 고른다.
+    """
+    ref = extract_post_date(view_html)
+    resolved: Dict[str, Optional[str]] = {}
+    out = []
+    for day, dish in items:
+        if day not in resolved:
+            d = resolve_label_date(day, ref)
+            resolved[day] = d.isoformat() if d else None
+        out.append((day, dish, resolved[day]))
+    return out
+
+def parse_view(view_html: str, meal: str = "중식", selector: str = LILAC_TABLE
+               ) -> Optional[List[Tuple[str, str, Optional[str]]]]:
+    """상세 글 HTML → [(day, dish, date_iso)], 표가 없으면 None"""
+    table = find_lilac_table(view_html, selector)
+    if not table:
+        return None
+    rows = parse_lunch_from_table(table) if meal == "중식" else parse_meal_from_table(table, meal)
+    return attach_dates(rows, view_html)
+
 # ------------- crawl_once(): 핵심 부분 (테스트용 프린트 기능 추가:TOTAL 값 유심히 보기) -------------
-def crawl_once() -> int:
+def crawl_once(force: bool = False) -> int:
     """
-    목록 → 최신 글 → 상세 표에서 '중식' 5일치 파싱 → DB 저장
+    켜져 있는 source(기본: 라일락 중식)를 모두 가져와 한 번에 DB 저장
+    목록/상세 페이지가 지난번과 같으면 파싱과 DB 쓰기를 건너뜀 (force=True면 항상 처리)
     반환값: 새로 추가된 row 수
     """
-    init_db()
-    list_html = fetch_html(LIST_URL)
-    view_url = find_latest_view_url(list_html, LIST_URL)
-    if not view_url:
-        print("[ERROR] 최신 글 링크를 못 찾았어.")
-        return 0
-
-    view_html = fetch_html(view_url)
-    table = find_lilac_table(view_html)
-    if not table:
-        print("[ERROR] 라일락 표를 못 찾았어.")
-        return 0
-
-    items = parse_lunch_from_table(table)
-    added = upsert(items)
-    print(f"[DONE] TOTAL added: {added}")
-
-    # 디버그 출력(선택)
-    grouped: Dict[str, List[str]] = {}
-    for d, m in items:
-        grouped.setdefault(d, []).append(m)
-    for d in grouped:
-        print(f"{d}:")
-        print(" - " + " · ".join(grouped[d]))
-        print()
-
-    return added
+    from crawler_radhaha.beready_sources import crawl_sources  # sources가 이 모듈을 import하므로 지연 import
+    return crawl_sources(force=force).added
 
 if __name__ == "__main__":
     crawl_once()
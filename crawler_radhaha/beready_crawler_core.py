@@ -1,127 +1,57 @@
 # -*- coding: utf-8 -*-
-import re
-import sqlite3
 import os  # ✅ 추가
-from datetime import datetime, timedelta
+import threading
+import time
+from datetime import date, datetime
 from typing import Dict, List, Optional
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 
-DB_PATH = "cafeteria.db"
-# 이 파일은 serve.py와 같은 경로에 저장됨 #
-
-SCHEMA_SQL = """
-CREATE TABLE IF NOT EXISTS lilac_menu(
-  id INTEGER PRIMARY KEY AUTOINCREMENT,
-  day_text TEXT NOT NULL,
-  menu TEXT NOT NULL,
-  UNIQUE(day_text, menu)
-);
-"""
-
-def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.executescript(SCHEMA_SQL)
-    cur.execute("PRAGMA journal_mode=WAL;")
-    cur.execute("PRAGMA busy_timeout=3000;")
-    conn.commit()
-    conn.close()
-
-# ---------- upsert 추가 ----------
-def upsert(items: List[tuple]) -> int:
-    if not items:
-        return 0
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    added = 0
-    for day, menu in items:
-        cur.execute(
-            "INSERT OR IGNORE INTO lilac_menu(day_text, menu) VALUES (?, ?)",
-            (day, menu),
-        )
-        if cur.rowcount:
-            added += 1
-    conn.commit()
-    conn.close()
-    return added
-
-# ✅ MongoDB 또는 SQLite에서 데이터를 가져오는 공통 함수 추가
-def _fetch_rows() -> List[tuple]:
-    """
-    MongoDB가 설정되어 있다면 MongoDB에서,
-    아니면 기존 SQLite에서 데이터를 가져온다.
-    """
-    if os.getenv("MONGODB_URI"):
-        try:
-            from crawler_radhaha.db import fetch_all  # db.py 안에 Mongo 용 fetch_all 있어야 함
-            return fetch_all()
-        except Exception as e:
-            print("[WARN] MongoDB fetch 실패, SQLite로 fallback:", e)
-
-    # 기본 SQLite 동작 유지
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute("SELECT day_text, menu FROM lilac_menu")
-    rows = cur.fetchall()
-    conn.close()
-    return rows
-
-DATE_RE = re.compile(r"(?P<m>\d{1,2})\s*월\s*(?P<d>\d{1,2})\s*일")
+import response_cache
+from io_executor import run_blocking
+from crawler_radhaha import db
+from crawler_radhaha.beready_dates import resolve_label_date, to_datetime, week_start
+from crawler_radhaha.beready_sources import SOURCES
+from crawler_radhaha import beready_search
 
-def _label_to_date(label: str) -> Optional[datetime]:
-    m = DATE_RE.search(label or "")
-    if not m:
-        return None
-    month, day = int(m.group("m")), int(m.group("d"))
-    today = datetime.today().date()
-    candidates = [
-        datetime(today.year - 1, month, day).date(),
-        datetime(today.year,     month, day).date(),
-        datetime(today.year + 1, month, day).date(),
-    ]
-    return datetime(min(candidates, key=lambda d: abs(d - today)).year, month, day)
-
-def _week_window(d: datetime):
-    monday = d - timedelta(days=d.weekday())
-    friday = monday + timedelta(days=4)
-    return monday, friday
-
-def get_latest_week_from_db() -> Dict:
-    # ✅ 여기만 한 줄 변경 (SQLite → Mongo 지원)
-    rows = _fetch_rows()
-
-    if not rows:
-        return {"week_start": None, "days": []}
-
-    by_label: Dict[str, Dict] = {}
-    for label, menu in rows:
-        if label not in by_label:
-            by_label[label] = {"date": _label_to_date(label), "menus": []}
-        by_label[label]["menus"].append(menu)
-
-    dated = [v["date"] for v in by_label.values() if v["date"]]
-    if not dated:
-        labels_sorted = sorted(by_label.keys())[-5:]
-        return {
-            "week_start": None,
-            "days": [{"label": lb, "menus": by_label[lb]["menus"]} for lb in labels_sorted]
-        }
-
-    latest = max(dated)
-    w_start, w_end = _week_window(latest)
-
-    items = [(dt, lb, info["menus"]) for lb, info in by_label.items()
-             if (dt := info["date"]) and w_start.date() <= dt.date() <= w_end.date()]
-    items.sort(key=lambda x: x[0])
+MENU_CACHE_TTL = float(os.getenv("BEREADY_MENU_CACHE_TTL", "300"))
+# 다른 프로세스(beready_scheduler 등)가 DB에 쓴 경우를 잡기 위해 이 주기마다 행 수만 확인
+
+# 저장소는 db.get_repository()로 통일 (기존 import 경로 호환용 이름)
+init_db = db.init_db
+upsert = db.upsert
 
+def _label_to_date(label: str) -> Optional[datetime]:
+    return to_datetime(resolve_label_date(label))
+
+def _undated_fallback(source: str = db.DEFAULT_SOURCE) -> Dict:
+    # 날짜를 하나도 못 읽은 경우: 예전처럼 라벨 정렬 순 마지막 5일
+    by_label: Dict[str, List[str]] = {}
+    for label, menu in db.get_repository().fetch_all(source):
+        by_label.setdefault(label, []).append(menu)
+    labels_sorted = sorted(by_label.keys())[-5:]
     return {
-        "week_start": w_start.strftime("%Y-%m-%d"),
-        "days": [{"date": d.strftime("%Y-%m-%d"), "label": lb, "menus": menus}
-                 for d, lb, menus in items]
+        "week_start": None,
+        "days": [{"label": lb, "menus": by_label[lb]} for lb in labels_sorted]
     }
 
+def get_week_from_db(week: Optional[str] = None, source: str = db.DEFAULT_SOURCE) -> Dict:
+    """week: 그 주 월요일('YYYY-MM-DD'), None이면 최신 주"""
+    week, rows = db.get_repository().fetch_week(week, source)
+    if week is None:
+        return _undated_fallback(source)
+
+    days: List[Dict] = []
+    for label, menu, d in rows:  # date 순으로 정렬되어 있음
+        if not days or days[-1]["label"] != label:
+            days.append({"date": d, "label": label, "menus": []})
+        days[-1]["menus"].append(menu)
+    return {"week_start": week, "days": days}
+
+def get_latest_week_from_db(source: str = db.DEFAULT_SOURCE) -> Dict:
+    return get_week_from_db(None, source)
+
 # ---------- Pydantic Models ----------
 class DayMenu(BaseModel):
     date: Optional[str]=None
@@ -132,14 +62,72 @@ class LatestWeekResponse(BaseModel):
     week_start: Optional[str]
     days: List[DayMenu]
 
+# ---------- 최신 주 응답 캐시 (source별) ----------
+class _MenuCache:
+    def __init__(self, encoded: response_cache.Encoded, fingerprint: int):
+        self.encoded = encoded  # 직렬화 + 압축까지 끝난 응답
+        self.fingerprint = fingerprint
+        self.checked_at = time.time()
+
+_menu_cache: Dict[str, _MenuCache] = {}
+_menu_cache_lock = threading.Lock()
+
+def invalidate_menu_cache():
+    """upsert가 실제로 행을 추가했을 때 호출 → 다음 요청에서 한 번만 다시 만듦"""
+    global _menu_cache
+    _menu_cache = {}
+
+db.get_repository().on_change(invalidate_menu_cache)
+
+def _build_menu_cache(fingerprint: int, source: str) -> _MenuCache:
+    data = get_latest_week_from_db(source)
+    LatestWeekResponse(**data)  # 검증은 만들 때 한 번만
+    return _MenuCache(response_cache.Encoded((source, fingerprint), data), fingerprint)
+
+def peek_menu_cache(source: str = db.DEFAULT_SOURCE) -> Optional[_MenuCache]:
+    """DB를 건드리지 않고 쓸 수 있는 캐시 (없거나 TTL이 지났으면 None)"""
+    cache = _menu_cache.get(source)
+    if cache and time.time() - cache.checked_at < MENU_CACHE_TTL:
+        return cache
+    return None
+
+def get_menu_cache(source: str = db.DEFAULT_SOURCE) -> _MenuCache:
+    cache = peek_menu_cache(source)
+    if cache:
+        return cache
+    with _menu_cache_lock:  # 동시에 여러 요청이 와도 DB는 한 번만 읽음
+        cache = _menu_cache.get(source)
+        if cache and time.time() - cache.checked_at < MENU_CACHE_TTL:
+            return cache
+        fingerprint = db.get_repository().count()
+        if cache and cache.fingerprint == fingerprint:
+            cache.checked_at = time.time()
+            return cache
+        cache = _build_menu_cache(fingerprint, source)
+        _menu_cache[source] = cache
+        return cache
+
 # ---------- fastapi용 Router ----------
 router = APIRouter()
 
+# 읽기 핸들러는 async: 메모리 캐시로 바로 응답하고, DB가 필요할 때만 io_executor로 넘김
 @router.get("/api/lilac/menu/health", response_model=dict)
-def health():
+async def health():
     return {"ok": True}
 
-@router.get("/api/lilac/menu", response_model=LatestWeekResponse)
-def api_latest_week():
-    return get_latest_week_from_db()
+@router.get("/api/lilac/menu/sources", response_model=list)
+async def api_sources():
+    return [{"name": s.name, "title": s.title, "meal": s.meal} for s in SOURCES.values()]
 
+@router.get("/api/lilac/menu", response_model=LatestWeekResponse)
+async def api_latest_week(request: Request, week: Optional[date] = None, source: str = db.DEFAULT_SOURCE):
+    """week를 주면 그 날짜가 속한 주(월요일 기준), 없으면 최신 주(캐시). source: 식당/끼니 (기본 라일락 중식)"""
+    if source not in SOURCES:
+        raise HTTPException(status_code=404, detail=f"unknown source: {source}")
+    if week is not None:
+        return await run_blocking(get_week_from_db, week_start(week).isoformat(), source)
+    cache = peek_menu_cache(source) or await run_blocking(get_menu_cache, source)
+    return response_cache.respond(request, cache.encoded)
+
+# 메뉴 검색 (/api/lilac/menu/search, /api/lilac/menu/dishes ...)
+router.include_router(beready_search.router)
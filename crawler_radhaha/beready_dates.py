@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+beready_dates.py
+- 식단표 라벨("10월 14일 (Monday)")을 실제 날짜로 바꾸는 공통 함수
+- 크롤러(저장 시)와 core(기존 데이터 보정)가 같이 사용
+"""
+import re
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+DATE_RE = re.compile(r"(?P<m>\d{1,2})\s*월\s*(?P<d>\d{1,2})\s*일")
+POST_DATE_RE = re.compile(r"(20\d{2})\s*[.\-/년]\s*(\d{1,2})\s*[.\-/월]\s*(\d{1,2})")
+
+WEEKDAY_NAMES = {
+    "Monday": 0, "Tuesday": 1, "Wednesday": 2, "Thursday": 3, "Friday": 4, "Saturday": 5, "Sunday": 6,
+    "(월)": 0, "(화)": 1, "(수)": 2, "(목)": 3, "(금)": 4, "(토)": 5, "(일)": 6,
+}
+
+
+def _label_weekday(label: str) -> Optional[int]:
+    for name, wd in WEEKDAY_NAMES.items():
+        if name in label:
+            return wd
+    return None
+
+
+def resolve_label_date(label: str, ref: Optional[date] = None) -> Optional[date]:
+    """
+    라벨의 월/일에 연도를 붙인다. 후보(ref 기준 전년/올해/내년) 중
+    라벨에 적힌 요일과 맞는 날짜를 우선으로, 그중 ref에 가장 가까운 것을 고른다.
+    """
+    m = DATE_RE.search(label or "")
+    if not m:
+        return None
+    month, day = int(m.group("m")), int(m.group("d"))
+    ref = ref or date.today()
+
+    candidates = []
+    for year in (ref.year - 1, ref.year, ref.year + 1):
+        try:
+            candidates.append(date(year, month, day))
+        except ValueError:  # 2월 29일 등
+            continue
+    if not candidates:
+        return None
+
+    wd = _label_weekday(label)
+    matching = [c for c in candidates if c.weekday() == wd]
+    return min(matching or candidates, key=lambda c: abs(c - ref))
+
+
+def week_start(d: date) -> date:
+    """그 주 월요일"""
+    return d - timedelta(days=d.weekday())
+
+
+def extract_post_date(html: str) -> Optional[date]:
+    """게시글 본문에서 처음 나오는 'YYYY.MM.DD' 형태 날짜 (연도 추정 기준으로 사용)"""
+    m = POST_DATE_RE.search(html or "")
+    if not m:
+        return None
+    try:
+        return date(int(m.group(1)), int(m.group(2)), int(m.group(3)))
+    except ValueError:
+        return None
+
+
+def to_datetime(d: Optional[date]) -> Optional[datetime]:
+    return datetime(d.year, d.month, d.day) if d else None
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+beready_fixture_server.py
+- PKNU 게시판 대역 서버: 저장해 둔 fixtures/pknu_view_lilac.html로 주마다 다른 식단표 글을 만들어 냄
+  (백필 / 조건부 GET / 여러 source 크롤링을 인터넷 없이 확인용)
+- 목록: /main/399?pageIndex=N (한 페이지 --per-page개, 최신 글부터) → 상세: /main/399?action=view&no=K
+- 글 번호가 하나 작을수록 한 주 전 식단 (가장 최신 글 = 픽스처 그대로, 10월 20일 주)
+- ETag / Last-Modified를 붙이고 If-None-Match가 맞으면 304
+
+    python -m crawler_radhaha.beready_fixture_server --posts 120 --port 8399
+    python -m crawler_radhaha.beready_backfill --list-url http://127.0.0.1:8399/main/399 --max-pages 5
+    BEREADY_LIST_URL=http://127.0.0.1:8399/main/399 python -m crawler_radhaha.beready_crawler
+
+--no-table 8990,8985 처럼 주면 그 글들은 식단표 없이 내보냄 (표를 못 찾는 경우 확인용)
+"""
+import argparse
+import hashlib
+import re
+from datetime import date, timedelta
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional, Set
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+BOARD_PATH = "/main/399"
+LATEST_NO = 9000
+LATEST_MONDAY = date(2025, 10, 20)  # 픽스처 글의 주 (월요일)
+LATEST_POSTED = date(2025, 10, 17)  # 픽스처 글의 작성일
+
+_TABLE = re.compile(r'<table class="con03_sub_2">.*?</table>', re.S)
+_DAY = re.compile(r"10월 (2[0-4])일")
+
+
+def _label(d: date) -> str:
+    return f"{d.month}월 {d.day}일"
+
+
+class Board:
+    def __init__(self, posts: int, per_page: int, no_table: Set[int]):
+        self.posts = posts
+        self.per_page = per_page
+        self.no_table = no_table
+        self.template = (FIXTURES / "pknu_view_lilac.html").read_text(encoding="utf-8")
+
+    def week_of(self, no: int) -> date:
+        return LATEST_MONDAY - timedelta(weeks=LATEST_NO - no)
+
+    def exists(self, no: int) -> bool:
+        return LATEST_NO - self.posts < no <= LATEST_NO
+
+    def list_page(self, page: int) -> str:
+        first = LATEST_NO - (page - 1) * self.per_page
+        rows = []
+        for no in range(first, max(first - self.per_page, LATEST_NO - self.posts), -1):
+            rows.append(f'<tr><td>{no}</td><td class="title"><a href="?action=view&amp;no={no}">'
+                        f'[라일락] {_label(self.week_of(no))} 주간식단표</a></td><td>학생식당</td></tr>')
+        return ('<html><head><meta charset="utf-8"><title>식단표</title></head><body>'
+                '<table class="bbs-list"><tr><th>번호</th><th>제목</th><th>작성자</th></tr>'
+                + "".join(rows) + "</table></body></html>")
+
+    def view_page(self, no: int) -> str:
+        monday = self.week_of(no)
+        shift = monday - LATEST_MONDAY
+        posted = LATEST_POSTED + shift
+        html = _DAY.sub(lambda m: _label(date(2025, 10, int(m.group(1))) + shift), self.template)
+        html = html.replace("작성일 2025.10.17", f"작성일 {posted:%Y.%m.%d}")
+        if no in self.no_table:
+            html = _TABLE.sub("<p>이번 주 식단은 첨부파일을 확인해 주세요.</p>", html)
+        return html
+
+
+def make_handler(board: Board):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            if parts.path.rstrip("/") != BOARD_PATH:
+                self.send_error(404)
+                return
+            qs = {k: v[0] for k, v in parse_qs(parts.query).items()}
+            body: Optional[str] = None
+            if qs.get("action") == "view":
+                no = int(qs.get("no", "0")) if qs.get("no", "").isdigit() else 0
+                if board.exists(no):
+                    body = board.view_page(no)
+            else:
+                page = int(qs.get("pageIndex", "1")) if qs.get("pageIndex", "1").isdigit() else 1
+                body = board.list_page(max(page, 1))
+            if body is None:
+                self.send_error(404)
+                return
+            data = body.encode("utf-8")
+            etag = '"' + hashlib.sha256(data).hexdigest()[:16] + '"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", formatdate(usegmt=True))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, fmt, *args):
+            print(f"[INFO] fixture board {fmt % args}")
+
+    return Handler
+
+
+def main():
+    ap = argparse.ArgumentParser(description="serve a fake PKNU menu board from saved fixtures")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8399)
+    ap.add_argument("--posts", type=int, default=60, help="number of weekly posts on the board")
+    ap.add_argument("--per-page", type=int, default=10)
+    ap.add_argument("--no-table", default="", help="comma separated post numbers served without a menu table")
+    args = ap.parse_args()
+
+    no_table = {int(n) for n in args.no_table.split(",") if n.strip().isdigit()}
+    board = Board(args.posts, args.per_page, no_table)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(board))
+    server.daemon_threads = True
+    print(f"[INFO] fixture board: http://{args.host}:{args.port}{BOARD_PATH} "
+          f"({args.posts} posts, {args.per_page} per page)")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+beready_jobs.py
+- 크롤링을 요청 스레드 밖(백그라운드 스레드)에서 실행하는 작업 관리
+- single-flight: 같은 이름의 작업이 돌고 있으면 새로 시작하지 않고 그 작업에 합류
+- 끝난 결과는 result_ttl초 동안 재사용 (연달아 누른 /trigger가 크롤링을 다시 돌리지 않음)
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from crawler_radhaha.beready_sources import crawl_sources
+
+RESULT_TTL = 60.0  # 초
+MAX_JOBS = 100  # 상태 조회용으로 기억해 둘 최근 작업 수
+
+
+class Job:
+    def __init__(self, name: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.status = "running"  # running / done / failed
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.done = threading.Event()
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id, "name": self.name, "status": self.status,
+            "started_at": self.started_at, "finished_at": self.finished_at,
+            "result": self.result, "error": self.error,
+        }
+
+
+class JobRunner:
+    def __init__(self, result_ttl: float = RESULT_TTL, max_jobs: int = MAX_JOBS):
+        self.result_ttl = result_ttl
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._latest: Dict[str, Job] = {}  # 이름별 가장 최근 작업
+        self._lock = threading.Lock()
+
+    def submit(self, name: str, fn: Callable[[], dict], reuse_result: bool = True) -> Tuple[Job, bool]:
+        """
+        (job, joined) 반환. joined=True면 이미 돌고 있던 작업(또는 방금 끝난 결과)을 돌려준 것.
+        reuse_result=False면 끝난 결과는 재사용하지 않음 (돌고 있는 작업에는 여전히 합류)
+        """
+        with self._lock:
+            job = self._latest.get(name)
+            if job is not None:
+                if job.status == "running":
+                    return job, True
+                if reuse_result and job.status == "done" and time.time() - job.finished_at < self.result_ttl:
+                    return job, True
+            job = Job(name)
+            self._latest[name] = job
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.popitem(last=False)
+        threading.Thread(target=self._run, args=(job, fn), daemon=True).start()
+        return job, False
+
+    def _run(self, job: Job, fn: Callable[[], dict]):
+        status, result, error = "done", None, None
+        try:
+            result = fn()
+        except Exception as e:
+            status, error = "failed", f"{type(e).__name__}: {e}"
+            print(f"[ERROR] job {job.name}/{job.id} failed: {error}")
+        finally:
+            # submit()이 status를 보고 finished_at을 읽으므로 같은 락 안에서 한 번에 바꿈
+            with self._lock:
+                job.result, job.error = result, error
+                job.finished_at = time.time()
+                job.status = status
+            job.done.set()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+
+runner = JobRunner()
+
+
+def _crawl(force: bool) -> dict:
+    result = crawl_sources(force=force)
+    return {"added": result.added, "changed_days": result.changed_days}
+
+
+def submit_crawl(force: bool = False) -> Tuple[Job, bool]:
+    """켜져 있는 source 전체 크롤링 (동시에 여러 번 불러도 한 번만 실행)"""
+    return runner.submit("crawl", lambda: _crawl(force), reuse_result=not force)
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+beready_parser_bench.py
+- 식단 파서 golden 검사 + 속도 비교 (네트워크 불필요)
+
+    python -m crawler_radhaha.beready_parser_bench            # golden 비교 + 벤치마크
+    python -m crawler_radhaha.beready_parser_bench --update   # golden 다시 만들기 (파서 동작을 일부러 바꿨을 때만)
+
+fixtures/*.html 을 현재 파서(beready_crawler)로 돌려 fixtures/golden.json 과 한 글자라도 다르면 exit 1.
+같은 입력을 예전 방식(html.parser로 페이지 전체 파싱 + 셀 텍스트 반복 계산)으로도 돌려
+결과가 같은지, 얼마나 빨라졌는지 함께 출력한다.
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup, Tag
+
+from crawler_radhaha import beready_crawler as crawler
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+GOLDEN = FIXTURES / "golden.json"
+BASE_URL = "https://www.pknu.ac.kr/main/399"
+
+
+# ---------------- 예전 방식 (비교 기준) ----------------
+def legacy_find_latest_view_url(list_html: str, base_url: str) -> Optional[str]:
+    soup = BeautifulSoup(list_html, "html.parser")
+    for sel in ("td.title a[href*='action=view']", "table a[href*='action=view']", "a[href*='action=view']"):
+        a = soup.select_one(sel)
+        if a and a.get("href"):
+            return urljoin(base_url, a["href"])
+    return None
+
+
+def legacy_find_lilac_table(view_html: str) -> Optional[Tag]:
+    soup = BeautifulSoup(view_html, "html.parser")
+    t = soup.select_one("table.con03_sub_2")
+    if t:
+        return t
+    for table in soup.find_all("table"):
+        first_tr = table.find("tr")
+        if not first_tr:
+            continue
+        first_text = first_tr.get_text(" ", strip=True)
+        if any(w in first_text for w in crawler.WEEK_EN) or crawler.DATE_PAT.search(first_text):
+            return table
+    return soup.find("table")
+
+
+def legacy_parse_lunch_from_table(table: Tag) -> List[Tuple[str, str]]:
+    cell_text = crawler.cell_text
+    rows_out: List[Tuple[str, str]] = []
+    trs = table.find_all("tr")
+    if len(trs) < 3:
+        return rows_out
+
+    day_cells = [c for c in trs[0].find_all(["th", "td"])
+                 if cell_text(c) and "구분" not in cell_text(c) and "운영정보" not in cell_text(c)][:5]
+    date_cells = [c for c in trs[1].find_all(["th", "td"]) if "운영정보" not in cell_text(c)][:5]
+
+    labels: List[str] = []
+    for i in range(5):
+        d_txt = cell_text(date_cells[i]) if i < len(date_cells) else ""
+        w_txt = cell_text(day_cells[i]) if i < len(day_cells) else ""
+        if d_txt and w_txt and w_txt not in d_txt:
+            labels.append(f"{d_txt} ({w_txt})")
+        elif d_txt:
+            labels.append(d_txt)
+        elif w_txt:
+            labels.append(w_txt)
+        else:
+            labels.append(f"Day{i+1}")
+
+    lunch_tr = None
+    for tr in trs[2:]:
+        if "중식" in " ".join(cell_text(c) for c in tr.find_all(["th", "td"])[:2]):
+            lunch_tr = tr
+            break
+    if not lunch_tr:
+        lunch_tr = trs[2]
+
+    tds = lunch_tr.find_all(["th", "td"])
+    skip = 0
+    for i, c in enumerate(tds[:2]):
+        if "구분" in cell_text(c) or "중식" in cell_text(c):
+            skip = i + 1
+    if skip == 0:
+        skip = 1
+    menu_cells = [c for c in tds[skip:] if "운영정보" not in cell_text(c)][:5]
+
+    ban_words = ("운영", "문의", "전화", "Open", "Close")
+    for i, cell in enumerate(menu_cells):
+        day = labels[i] if i < len(labels) else f"Day{i+1}"
+        lines = [ln.strip() for ln in cell_text(cell).split("\n") if ln.strip()]
+        lines = [ln for ln in lines if not any(b in ln for b in ban_words)]
+        for dish in crawler.squash_slash(lines):
+            rows_out.append((day, dish))
+    return rows_out
+
+
+# ---------------- 실행 ----------------
+def run_current(html: str) -> dict:
+    table = crawler.find_lilac_table(html)
+    return {
+        "view_url": crawler.find_latest_view_url(html, BASE_URL),
+        "lunch": [list(r) for r in crawler.parse_lunch_from_table(table)] if table else [],
+    }
+
+
+def run_legacy(html: str) -> dict:
+    table = legacy_find_lilac_table(html)
+    return {
+        "view_url": legacy_find_latest_view_url(html, BASE_URL),
+        "lunch": [list(r) for r in legacy_parse_lunch_from_table(table)] if table else [],
+    }
+
+
+def time_it(fn, html: str, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(html)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="menu parser golden check + benchmark")
+    ap.add_argument("--repeat", type=int, default=50)
+    ap.add_argument("--update", action="store_true", help="write fixtures/golden.json from the current parser")
+    args = ap.parse_args(argv)
+
+    pages = {p.name: p.read_text(encoding="utf-8") for p in sorted(FIXTURES.glob("*.html"))}
+    if args.update:
+        golden = {name: run_current(html) for name, html in pages.items()}
+        GOLDEN.write_text(json.dumps(golden, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"[INFO] wrote {GOLDEN} ({len(golden)} pages)")
+        return 0
+
+    golden = json.loads(GOLDEN.read_text(encoding="utf-8"))
+    failed = False
+    report = {"parser": crawler.HTML_PARSER, "pages": {}}
+    for name, html in pages.items():
+        current, legacy = run_current(html), run_legacy(html)
+        ok = current == golden.get(name) and legacy == current
+        failed |= not ok
+        report["pages"][name] = {
+            "match": ok,
+            "legacy_ms": round(time_it(run_legacy, html, args.repeat), 3),
+            "current_ms": round(time_it(run_current, html, args.repeat), 3),
+        }
+        if not ok:
+            print(f"[FAIL] {name}: golden={golden.get(name)} current={current} legacy={legacy}")
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,36 +4,172 @@
 # License: MIT
 """
 beready_scheduler.py
-- APScheduler로 매주 월요일 오전 06:00(KST) 1회 최신 식단표 크롤링
-- 별도 프로세스로 실행:  python scheduler.py
+- 웹 앱 프로세스 안에서 도는 크롤링 스케줄러 (main.py startup에서 start_scheduler())
+- tick_interval(기본 5분, jitter 포함)마다 tick()이 DB에 저장된 실행 기록만 보고 크롤링이 필요한지 판단
+  · 월요일 06:00(KST) 이후 이번 주 식단이 아직 없으면 크롤링 → 새 주가 들어올 때까지 점점 간격을 늘려 재시도
+  · 이번 주 식단이 이미 있으면 다음 주 월요일까지 아무것도 가져오지 않음
+- 재시작해도 기록(마지막 성공 시각, 최신 주, 내용 해시)이 DB에 남아 있어 놓치거나 중복 실행하지 않음
+- 실제 실행은 beready_jobs의 single-flight 작업으로 → /trigger와 겹쳐도 한 번만 돎
+- 별도 프로세스로도 실행 가능:  python -m crawler_radhaha.beready_scheduler
+- single-flight는 프로세스 안에서만 통하므로 BEREADY_ROLE=api(uvicorn --workers N)에서는 기본으로 꺼짐
+  → 그때는 위 명령으로 스케줄러 프로세스를 하나만 따로 띄울 것
 """
+import hashlib
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
 
-import asyncio
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.cron import CronTrigger
+from apscheduler.schedulers.background import BackgroundScheduler, BlockingScheduler
+from apscheduler.triggers.interval import IntervalTrigger
 
-from crawler_radhaha.beready_crawler import crawl_once  # 크롤링 함수 재사용
+from crawler_radhaha import db
+from crawler_radhaha.beready_jobs import submit_crawl
+from crawler_radhaha.beready_sources import enabled_sources
 
-async def crawl_job():
-    # 블로킹 I/O는 스레드로
-    await asyncio.to_thread(crawl_once)
+KST = timezone(timedelta(hours=9))
+STATE_KEY = "schedule:crawl"
 
-async def main():
-    scheduler = AsyncIOScheduler(timezone="Asia/Seoul")
-    # 매주 월요일 06:00
+TICK_INTERVAL = float(os.getenv("BEREADY_SCHED_TICK", "300"))  # 초, DB 기록만 확인 (외부 요청 없음)
+TICK_JITTER = 60
+RELEASE_HOUR = 6  # 월요일 이 시각(KST) 이후부터 새 주 식단을 찾음
+POLL_MIN = float(os.getenv("BEREADY_SCHED_POLL_MIN", "600"))  # 새 주를 기다리는 동안 첫 재시도 간격
+POLL_MAX = float(os.getenv("BEREADY_SCHED_POLL_MAX", "3600"))
+JOB_TIMEOUT = 300
+
+
+def load_state() -> dict:
+    return db.get_repository().get_meta(STATE_KEY) or {}
+
+
+def save_state(state: dict):
+    db.get_repository().set_meta(STATE_KEY, state)
+
+
+def current_week(now: datetime) -> Optional[str]:
+    """이번 주 식단이 나와 있어야 하는 주의 월요일 (월요일 06시 전이면 아직 지난주)"""
+    monday = (now - timedelta(days=now.weekday())).replace(hour=RELEASE_HOUR, minute=0, second=0, microsecond=0)
+    if now < monday:
+        monday -= timedelta(days=7)
+    return monday.date().isoformat()
+
+
+def poll_interval(attempts: int) -> float:
+    """새 주를 기다리며 실패(아직 안 올라옴)할수록 간격을 두 배씩, POLL_MAX까지"""
+    return min(POLL_MAX, POLL_MIN * 2 ** max(attempts - 1, 0))
+
+
+def latest_stored() -> Tuple[Optional[str], str]:
+    """켜져 있는 source들의 최신 주와 그 주 내용 해시"""
+    weeks, h = [], hashlib.sha1()
+    for src in enabled_sources():
+        week, rows = db.fetch_week(None, src.name)
+        if week:
+            weeks.append(week)
+        h.update(json.dumps([src.name, week, rows], ensure_ascii=False).encode("utf-8"))
+    return (max(weeks) if weeks else None), h.hexdigest()[:16]
+
+
+def is_due(state: dict, now: datetime) -> bool:
+    target = current_week(now)
+    if state.get("latest_week") and state["latest_week"] >= target:
+        return False  # 이번 주는 이미 받음 → 다음 월요일까지 쉼
+    attempts = state.get("attempts", 0) if state.get("attempts_week") == target else 0
+    if now.weekday() >= 5 and attempts:
+        return False  # 주말에는 새 식단이 올라오지 않음 (이번 주에 한 번도 안 돌았으면 한 번은 확인)
+    last = state.get("last_attempt")
+    return last is None or now.timestamp() - last >= poll_interval(attempts)
+
+
+def tick(now: Optional[datetime] = None) -> bool:
+    """크롤링이 필요하면 실행하고 기록 갱신. 실행했으면 True"""
+    db.init_db()
+    now = now or datetime.now(KST)
+    state = load_state()
+    if "latest_week" not in state:  # 처음 실행: DB에 이미 있는 데이터부터 반영
+        state["latest_week"], state["content_hash"] = latest_stored()
+        save_state(state)
+    if not is_due(state, now):
+        return False
+
+    target = current_week(now)
+    if state.get("attempts_week") != target:
+        state["attempts_week"], state["attempts"] = target, 0
+    state["last_attempt"] = now.timestamp()
+    state["attempts"] += 1
+
+    job, joined = submit_crawl()
+    job.done.wait(JOB_TIMEOUT)
+    if job.status == "done":
+        state["last_success"] = time.time()
+        state["last_error"] = None
+        state["latest_week"], state["content_hash"] = latest_stored()
+    else:
+        state["last_error"] = job.error or job.status
+    save_state(state)
+    if state.get("latest_week") and state["latest_week"] >= target:
+        print(f"[SCHED] crawl {job.status} (joined={joined}): week {target} found, idle until next Monday")
+    else:
+        print(f"[SCHED] crawl {job.status} (joined={joined}): waiting for week {target}, "
+              f"retry in {poll_interval(state['attempts']):.0f}s")
+    return True
+
+
+def _safe_tick():
+    try:
+        tick()
+    except Exception as e:
+        print(f"[WARN] scheduler tick failed: {e}")
+
+
+def _add_jobs(scheduler):
+    # next_run_time=지금 → 시작하자마자 한 번 확인 (재시작 직후 놓친 실행 보충)
     scheduler.add_job(
-        lambda: asyncio.create_task(crawl_job()),
-        CronTrigger(day_of_week="mon", hour=6, minute=0),
-        id="weekly_monday_crawl",
+        _safe_tick,
+        IntervalTrigger(seconds=TICK_INTERVAL, jitter=TICK_JITTER),
+        id="menu_crawl_tick",
+        next_run_time=datetime.now(KST),
         coalesce=True,
-        misfire_grace_time=3600,
         max_instances=1,
         replace_existing=True,
     )
+
+
+_scheduler: Optional[BackgroundScheduler] = None
+
+
+def scheduler_enabled() -> bool:
+    """BEREADY_SCHEDULER=0/1로 지정, 없으면 api 역할(워커 여러 개)에서는 끔 - 워커마다 PKNU를 따로 크롤링하지 않게"""
+    default = "0" if os.getenv("BEREADY_ROLE", "all") == "api" else "1"
+    return os.getenv("BEREADY_SCHEDULER", default) != "0"
+
+
+def start_scheduler() -> Optional[BackgroundScheduler]:
+    """앱 프로세스 안에서 시작 (scheduler_enabled()가 False면 안 띄움: 별도 프로세스로 돌릴 때)"""
+    global _scheduler
+    if not scheduler_enabled() or _scheduler is not None:
+        return _scheduler
+    _scheduler = BackgroundScheduler(timezone="Asia/Seoul")
+    _add_jobs(_scheduler)
+    _scheduler.start()
+    print(f"[SCHED] started (tick every {TICK_INTERVAL:.0f}s, new week from Monday {RELEASE_HOUR:02d}:00 KST)")
+    return _scheduler
+
+
+def stop_scheduler():
+    global _scheduler
+    if _scheduler is not None:
+        _scheduler.shutdown(wait=False)
+        _scheduler = None
+
+
+def main():
+    scheduler = BlockingScheduler(timezone="Asia/Seoul")
+    _add_jobs(scheduler)
+    print("[SCHED] started (standalone)")
     scheduler.start()
-    print("[SCHED] started (runs every Monday 06:00 KST)")
-    # 무한 대기
-    await asyncio.Event().wait()
+
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    main()
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""
+beready_search.py
+- 메뉴 검색용 메모리 색인 ("돈까스 언제 나와?", 이번 달 메뉴, 자주 나오는 메뉴)
+- 메뉴 이름(NFKC 정규화) → 나온 날짜 목록, 글자 2-gram → 메뉴 이름, 월 → 메뉴별 횟수
+- 처음 조회할 때 저장소 전체를 한 번 읽어 만들고, 이후에는 ingest가 새로 쓴 행만 더함 (db on_ingest)
+- 다른 프로세스(스케줄러 단독 실행, 다른 uvicorn 워커)가 쓴 행은 on_ingest로 안 오므로
+  SEARCH_INDEX_TTL초마다 저장소 행 수(count)와 비교해서 다르면 다시 읽음 (메뉴 캐시와 같은 방식)
+- 조회는 색인만 보므로 쌓인 기간과 상관없이 빠름 (2-gram 교집합 → 후보 메뉴만 부분 문자열 확인)
+- 전체를 다시 읽을 때는 락 밖에서 새 색인을 만든 뒤 참조만 바꿈 → 조회(이벤트 루프)가 전체 스캔 동안 막히지 않음
+"""
+import bisect
+import heapq
+import os
+import re
+import threading
+import time
+import unicodedata
+from typing import Dict, List, Optional, Set
+
+from fastapi import APIRouter, Query
+
+from crawler_radhaha import db
+from io_executor import run_blocking
+
+SEARCH_INDEX_TTL = float(os.getenv("BEREADY_SEARCH_INDEX_TTL", "300"))  # 저장소 행 수를 다시 확인할 간격(초)
+
+_SPACES = re.compile(r"\s+")
+_SPLIT = re.compile(r"[\s/&+,·()\[\]]+")  # 질의어를 단어로 나눌 때
+
+
+def normalize(text: str) -> str:
+    """전각/반각, 호환 문자 통일 + 소문자 + 공백 하나로"""
+    return _SPACES.sub(" ", unicodedata.normalize("NFKC", text or "")).strip().lower()
+
+
+def bigrams(text: str) -> Set[str]:
+    s = text.replace(" ", "")
+    return {s[i:i + 2] for i in range(len(s) - 1)}
+
+
+class _Dish:
+    __slots__ = ("name", "key", "dates", "sources")
+
+    def __init__(self, name: str, key: str):
+        self.name = name  # 처음 본 표기 그대로 (응답용)
+        self.key = key
+        self.dates: List[str] = []  # 'YYYY-MM-DD' 정렬 유지 (같은 날 여러 source면 중복)
+        self.sources: Dict[str, List[str]] = {}  # source → 정렬된 날짜
+
+
+class MenuSearchIndex:
+    def __init__(self):
+        self._dishes: Dict[str, _Dish] = {}
+        self._grams: Dict[str, Set[str]] = {}  # 2-gram → 메뉴 key
+        self._months: Dict[str, Dict[str, Dict[str, int]]] = {}  # 'YYYY-MM' → source → {key: 횟수}
+        self._seen: Set[tuple] = set()  # (source, day, menu) 이미 반영한 행 (build와 ingest가 겹쳐도 한 번만)
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._built = False
+        self._checked_at = 0.0  # 마지막으로 저장소 행 수와 맞춰 본 시각
+        self._pending: Optional[List[tuple]] = None  # 다시 만드는 동안 ingest로 들어온 행 (교체 후 다시 반영)
+
+    # ---------------- 갱신 ----------------
+    def add_rows(self, rows: List[tuple]):
+        """rows: [(day, menu, date, week_start, source), ...] (db.normalize_items 형식)"""
+        with self._lock:
+            if self._pending is not None:
+                self._pending.extend(rows)
+            self._add(rows)
+
+    def _add(self, rows: List[tuple]):
+        """락을 잡은 상태에서 (또는 아직 공유되지 않은 새 색인에) 호출"""
+        for day, menu, d, _ws, src in rows:
+            if (src, day, menu) in self._seen:
+                continue
+            self._seen.add((src, day, menu))  # 날짜 없는 행도 세어 둬야 저장소 count와 맞음
+            key = normalize(menu) if d else ""
+            if not key:
+                continue
+            dish = self._dishes.get(key)
+            if dish is None:
+                dish = self._dishes[key] = _Dish(menu, key)
+                for g in bigrams(key):
+                    self._grams.setdefault(g, set()).add(key)
+            bisect.insort(dish.dates, d)
+            bisect.insort(dish.sources.setdefault(src, []), d)
+            month = self._months.setdefault(d[:7], {}).setdefault(src, {})
+            month[key] = month.get(key, 0) + 1
+
+    def _rebuild(self, repo) -> int:
+        """
+        _build_lock을 잡은 상태에서 호출. 저장소 전체로 새 색인을 락 밖에서 만들고 참조만 교체,
+        그 사이 on_ingest로 들어온 행은 교체하면서 다시 반영. 읽은 행 수를 돌려줌
+        """
+        with self._lock:
+            self._pending = []
+        try:
+            rows = repo.fetch_rows()
+            fresh = MenuSearchIndex()
+            fresh._add(rows)
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+        with self._lock:
+            pending, self._pending = self._pending, None
+            self._dishes, self._grams = fresh._dishes, fresh._grams
+            self._months, self._seen = fresh._months, fresh._seen
+            self._add(pending)
+        return len(rows)
+
+    @property
+    def built(self) -> bool:
+        return self._built
+
+    def ensure_built(self, repo=None):
+        if self._built:
+            return
+        repo = repo or db.get_repository()
+        with self._build_lock:
+            if self._built:
+                return
+            started = time.perf_counter()
+            n = self._rebuild(repo)
+            self._checked_at = time.time()
+            self._built = True
+        print(f"[INFO] Menu search index: {len(self._dishes)} dishes from {n} rows "
+              f"in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+    def stale(self) -> bool:
+        """TTL이 지나서 저장소 행 수를 다시 확인해야 하는지"""
+        return self._built and time.time() - self._checked_at >= SEARCH_INDEX_TTL
+
+    def refresh(self, repo=None):
+        """
+        저장소 행 수가 색인과 다르면(다른 프로세스가 쓰거나 지움) 새로 만들어 교체.
+        이미 다른 스레드가 확인 중이면 기다리지 않고 지금 색인으로 응답.
+        """
+        if not self._build_lock.acquire(blocking=False):
+            return
+        try:
+            if not self.stale():
+                return
+            repo = repo or db.get_repository()
+            n = repo.count()
+            if n != len(self._seen):
+                self._rebuild(repo)
+            if n != len(self._seen):
+                print(f"[WARN] Menu search index has {len(self._seen)} rows, storage reports {n}")
+            self._checked_at = time.time()
+        finally:
+            self._build_lock.release()
+
+    # ---------------- 조회 ----------------
+    def _candidates(self, term: str) -> Set[str]:
+        grams = bigrams(term)
+        if not grams:  # 한 글자 질의: 메뉴 이름 전체에서 (메뉴 종류 수만큼만)
+            return {k for k in self._dishes if term in k.replace(" ", "")}
+        postings = sorted((self._grams.get(g, set()) for g in grams), key=len)
+        found = set(postings[0])
+        for p in postings[1:]:
+            found &= p
+            if not found:
+                break
+        return {k for k in found if term in k.replace(" ", "")}
+
+    def _dates(self, dish: _Dish, source: Optional[str]) -> List[str]:
+        return dish.sources.get(source, []) if source else dish.dates
+
+    def search(self, q: str, source: Optional[str] = None, limit: int = 20, dates: int = 10) -> List[dict]:
+        terms = [t for t in _SPLIT.split(normalize(q)) if t]
+        if not terms:
+            return []
+        with self._lock:
+            keys = self._candidates(terms[0])
+            for t in terms[1:]:
+                keys &= self._candidates(t)
+            out = []
+            for k in keys:
+                ds = self._dates(self._dishes[k], source)
+                if ds:
+                    out.append({"dish": self._dishes[k].name, "count": len(ds), "first": ds[0], "last": ds[-1],
+                                "recent": ds[::-1][:dates]})
+        out.sort(key=lambda r: (r["last"], r["count"]), reverse=True)
+        return out[:limit]
+
+    def month(self, month: str, source: Optional[str] = None) -> List[dict]:
+        with self._lock:
+            by_source = self._months.get(month, {})
+            counts: Dict[str, int] = {}
+            for src, dishes in by_source.items():
+                if source and src != source:
+                    continue
+                for k, n in dishes.items():
+                    counts[k] = counts.get(k, 0) + n
+            out = [{"dish": self._dishes[k].name, "count": n} for k, n in counts.items()]
+        out.sort(key=lambda r: (-r["count"], r["dish"]))
+        return out
+
+    def top(self, limit: int = 20, source: Optional[str] = None) -> List[dict]:
+        with self._lock:
+            best = heapq.nlargest(limit, self._dishes.values(), key=lambda d: len(self._dates(d, source)))
+            return [{"dish": d.name, "count": len(self._dates(d, source)), "last": self._dates(d, source)[-1]}
+                    for d in best if self._dates(d, source)]
+
+
+index = MenuSearchIndex()
+db.get_repository().on_ingest(index.add_rows)
+
+# ---------- fastapi용 Router (beready_crawler_core.router에 포함됨) ----------
+router = APIRouter()
+
+
+async def _timed(fn):
+    if not index.built:  # 처음 한 번만 DB 전체를 읽음 → 전용 스레드풀에서
+        await run_blocking(index.ensure_built)
+    elif index.stale():  # 다른 프로세스가 쓴 행 반영
+        await run_blocking(index.refresh)
+    started = time.perf_counter()
+    results = fn()
+    return results, round((time.perf_counter() - started) * 1000, 3)
+
+
+@router.get("/api/lilac/menu/search", response_model=dict)
+async def api_search(q: str = Query(..., min_length=1, max_length=50), source: Optional[str] = None,
+               limit: int = Query(20, ge=1, le=100)):
+    """메뉴 이름으로 검색 → 메뉴별 나온 횟수, 처음/마지막 날짜, 최근 날짜들"""
+    results, took = await _timed(lambda: index.search(q, source, limit))
+    return {"query": q, "took_ms": took, "results": results}
+
+
+@router.get("/api/lilac/menu/dishes", response_model=dict)
+async def api_dishes_by_month(month: str = Query(..., pattern=r"^\d{4}-\d{2}$"), source: Optional[str] = None):
+    """그 달(YYYY-MM)에 나온 메뉴와 횟수"""
+    results, took = await _timed(lambda: index.month(month, source))
+    return {"month": month, "took_ms": took, "dishes": results}
+
+
+@router.get("/api/lilac/menu/dishes/top", response_model=dict)
+async def api_top_dishes(limit: int = Query(20, ge=1, le=100), source: Optional[str] = None):
+    """전체 기간 동안 가장 많이 나온 메뉴"""
+    results, took = await _timed(lambda: index.top(limit, source))
+    return {"took_ms": took, "dishes": results}
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+beready_sources.py
+- 식당/끼니별 크롤링 대상(source) 등록소 + 한 번에 실행하는 runner
+- source 하나 = (게시판 목록 URL, 표 선택자, 끼니 이름). 다른 식당은 register(MenuSource(...))로 추가,
+  표 모양이 다르면 MenuSource를 상속해 parse()만 바꾸면 됨
+- 켜는 source: BEREADY_SOURCES=lilac_lunch,lilac_dinner (기본 lilac_lunch)
+- runner는 같은 게시판을 쓰는 source끼리 묶어 목록/상세 페이지를 한 번만 받고,
+  게시판끼리는 공유 Session으로 동시에 받은 뒤 전체 결과를 ingest 한 번으로 저장
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from crawler_radhaha.beready_crawler import (
+    LIST_URL, LILAC_TABLE, Page, fetch_html, fetch_if_changed, find_latest_view_url, parse_view, remember,
+)
+from crawler_radhaha.db import DEFAULT_SOURCE, IngestResult, get_repository, init_db, ingest
+
+
+class MenuSource:
+    def __init__(self, name: str, title: str, meal: str, list_url: str = LIST_URL, table: str = LILAC_TABLE):
+        self.name = name  # DB의 source 값, API의 ?source= 값
+        self.title = title
+        self.meal = meal  # 표 왼쪽 구분 칸의 끼니 이름
+        self.list_url = list_url
+        self.table = table
+
+    def parse(self, view_html: str) -> Optional[List[Tuple[str, str, Optional[str]]]]:
+        """상세 글 HTML → [(day, dish, date_iso)], 표가 없으면 None"""
+        return parse_view(view_html, self.meal, self.table)
+
+
+SOURCES: Dict[str, MenuSource] = {}
+
+
+def register(source: MenuSource) -> MenuSource:
+    SOURCES[source.name] = source
+    return source
+
+
+register(MenuSource("lilac_breakfast", "라일락 조식", "조식"))
+register(MenuSource(DEFAULT_SOURCE, "라일락 중식", "중식"))
+register(MenuSource("lilac_dinner", "라일락 석식", "석식"))
+
+
+def enabled_sources() -> List[MenuSource]:
+    names = [n.strip() for n in os.getenv("BEREADY_SOURCES", DEFAULT_SOURCE).split(",") if n.strip()]
+    unknown = [n for n in names if n not in SOURCES]
+    if unknown:
+        raise RuntimeError(f"Unknown BEREADY_SOURCES: {unknown} (registered: {sorted(SOURCES)})")
+    return [SOURCES[n] for n in names]
+
+
+# ---------------- runner ----------------
+class BoardResult(NamedTuple):
+    list_url: str
+    pages: List[Page]  # 처리가 끝나면 remember()할 페이지
+    view_html: Optional[str]  # None이면 바뀐 게 없어서 건너뜀
+
+
+def _fetch_board(list_url: str, names: List[str], force: bool) -> BoardResult:
+    # 지난번과 다른 source 조합이면(BEREADY_SOURCES에 새로 켬) 페이지가 그대로여도 다시 파싱
+    seen = (get_repository().get_meta(f"http:{list_url}") or {}).get("sources")
+    if seen != names and not force:
+        print(f"[INFO] {list_url}: source 구성 변경 {seen} → {names}, 다시 파싱")
+        force = True
+    list_page = fetch_if_changed(list_url)
+    if not list_page.changed and not force:
+        print(f"[SKIP] {list_url}: 목록 페이지 변경 없음")
+        return BoardResult(list_url, [], None)
+    view_url = find_latest_view_url(list_page.text or fetch_html(list_url), list_url)
+    if not view_url:
+        print(f"[ERROR] {list_url}: 최신 글 링크를 못 찾았어.")
+        return BoardResult(list_url, [], None)
+    view_page = fetch_if_changed(view_url)
+    if not view_page.changed and not force:
+        print(f"[SKIP] {list_url}: 최신 글 변경 없음")
+        return BoardResult(list_url, [list_page], None)
+    return BoardResult(list_url, [view_page, list_page], view_page.text or fetch_html(view_url))
+
+
+def crawl_sources(sources: Optional[List[MenuSource]] = None, force: bool = False) -> IngestResult:
+    """
+    source 여러 개를 한 번에: 게시판별 병렬 다운로드 → source별 파싱 → ingest 1회
+    페이지 기록(ETag/해시)은 저장까지 끝난 뒤에만 남김 → 중간에 실패하면 다음 번에 다시 처리
+    """
+    sources = sources or enabled_sources()
+    init_db()
+    boards: Dict[str, List[MenuSource]] = {}
+    for src in sources:
+        boards.setdefault(src.list_url, []).append(src)
+
+    names = {url: sorted(src.name for src in group) for url, group in boards.items()}
+
+    results: List[BoardResult] = []
+    with ThreadPoolExecutor(max_workers=min(len(boards), 8)) as pool:
+        futures = {pool.submit(_fetch_board, url, names[url], force): url for url in boards}
+        for future, url in futures.items():
+            try:
+                results.append(future.result())
+            except Exception as e:  # 한 게시판이 실패해도 나머지는 저장 (실패한 곳은 기록 안 남김 → 다음에 다시)
+                print(f"[ERROR] {url}: 가져오기 실패 ({e})")
+
+    items: List[tuple] = []
+    done: List[BoardResult] = []  # 페이지를 기록해도 되는 게시판
+    for board in results:
+        if board.view_html is None:  # 바뀐 게 없음 (목록만 바뀌었으면 목록 페이지만 기록)
+            done.append(board)
+            continue
+        parsed = False
+        for src in boards[board.list_url]:
+            rows = src.parse(board.view_html)
+            if not rows:  # None: 표 없음, []: 다른 표를 잡았거나 그 끼니 행이 없음
+                print(f"[ERROR] {src.name}: 표를 못 찾았어.")
+                continue
+            parsed = True
+            items.extend((day, dish, d, src.name) for day, dish, d in rows)
+            print(f"[PARSE] {src.name}: {len(rows)} rows")
+        if parsed:  # 아무 source도 표를 못 찾았으면 기록하지 않음 → 다음 실행에서 다시 시도
+            done.append(board)
+
+    result = ingest(items)
+    print(f"[DONE] TOTAL added: {result.added}, changed days: {result.changed_days}")
+
+    for board in done:
+        for page in board.pages:
+            remember(page._replace(validators=dict(page.validators, sources=names[board.list_url])))
+    return result
@@ -1,46 +1,520 @@
 # db.py
+"""
+식단 저장소 (SQLite / MongoDB / 메모리)
+- 프로세스 시작 시 get_repository()가 한 번만 백엔드를 고르고, 모든 읽기/쓰기가 이 객체를 거침
+- BEREADY_STORAGE=sqlite|mongo|memory 로 지정, 없으면 MONGODB_URI가 있을 때 mongo, 아니면 sqlite
+- 아래 init_db / upsert / fetch_all 등 모듈 함수는 기존 호출부 호환용
+"""
+import json
 import os
-from pymongo import MongoClient, UpdateOne
-from pymongo.errors import BulkWriteError
+import queue
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import date
+from typing import Callable, List, NamedTuple, Optional
+
+from crawler_radhaha.beready_dates import resolve_label_date, week_start
 
 MONGODB_URI = os.getenv("MONGODB_URI")
 DBNAME = os.getenv("MONGODB_DBNAME", "beready")
 COLL = os.getenv("MONGODB_COLL", "lilac_menu")
+META_COLL = os.getenv("MONGODB_META_COLL", "crawl_meta")
+MONGODB_POOL_SIZE = int(os.getenv("MONGODB_POOL_SIZE", "20"))
+
+SQLITE_PATH = os.getenv("BEREADY_SQLITE_PATH", "cafeteria.db")  # serve.py와 같은 경로에 저장됨
+SQLITE_POOL_SIZE = int(os.getenv("BEREADY_SQLITE_POOL_SIZE", "4"))
+
+DEFAULT_SOURCE = "lilac_lunch"  # source 구분이 생기기 전 데이터는 모두 라일락 중식
+
+
+def normalize_items(items: List[tuple]) -> List[tuple]:
+    """
+    (day, menu) / (day, menu, date) / (day, menu, date, source)
+    → (day, menu, date_iso, week_start_iso, source)
+    date가 없으면 오늘 기준으로 라벨에서 추정, source가 없으면 DEFAULT_SOURCE
+    """
+    out = []
+    for item in items:
+        day, menu = item[0], item[1]
+        d = item[2] if len(item) > 2 and item[2] else resolve_label_date(day)
+        if isinstance(d, str):
+            d = date.fromisoformat(d)
+        source = item[3] if len(item) > 3 and item[3] else DEFAULT_SOURCE
+        out.append((day, menu, d.isoformat() if d else None, week_start(d).isoformat() if d else None, source))
+    return out
+
+
+def row_key(row: tuple) -> tuple:
+    """normalize_items 결과 행의 유니크 키 (source, day_text, menu)"""
+    return row[4], row[0], row[1]
+
+
+class IngestResult(NamedTuple):
+    added: int  # 새로 저장된 (source, day, menu) 행 수
+    changed_days: List[str]  # 새 메뉴가 생긴 날 라벨 (입력 순서)
+
+
+def _changed_days(delta: List[tuple]) -> List[str]:
+    return list(dict.fromkeys(row[0] for row in delta))
+
+
+class MenuRepository(ABC):
+    """
+    저장소 공통 인터페이스. 아래 @abstractmethod를 하나라도 빠뜨린 backend는 생성하는 순간 TypeError
+    (요청 처리 도중이 아니라 시작할 때 드러남).
+    모든 행은 source(식당/끼니, 예: lilac_lunch)별로 구분되어 저장되고 조회도 source 단위.
+    fetch_week()는 (week_start, [(day_text, menu, date), ...]), week가 None이면 최신 주.
+    count()는 캐시 검증용 지문 (추가만 되는 테이블이라 개수가 같으면 내용도 같음).
+    """
+    name = "base"
+
+    def __init__(self):
+        self._listeners: List[Callable[[], None]] = []
+        self._row_listeners: List[Callable[[List[tuple]], None]] = []
+        self._ready = False
+        self._init_lock = threading.Lock()
+
+    def on_change(self, fn: Callable[[], None]):
+        """행이 실제로 추가됐을 때 호출할 함수 등록 (응답 캐시 무효화 등)"""
+        self._listeners.append(fn)
+
+    def on_ingest(self, fn: Callable[[List[tuple]], None]):
+        """실제로 추가된 행 [(day, menu, date, week_start, source), ...]을 받을 함수 등록 (검색 색인 등)"""
+        self._row_listeners.append(fn)
+
+    def _changed(self, rows: List[tuple]):
+        for fn in self._row_listeners:
+            fn(rows)
+        for fn in self._listeners:
+            fn()
+
+    def init(self):
+        pass
+
+    def ensure_init(self):
+        """init()을 프로세스당 한 번만 (실패하면 다음 호출에서 다시 시도)"""
+        if self._ready:
+            return
+        with self._init_lock:
+            if not self._ready:
+                self.init()
+                self._ready = True
+
+    def upsert(self, items: List[tuple]) -> int:
+        return self.ingest(items).added
+
+    def ingest(self, items: List[tuple]) -> IngestResult:
+        """
+        대량 저장: 들어온 (source, day, menu)를 이미 저장된 것과 먼저 비교하고,
+        새로 생긴 행(delta)만 한 번에(한 트랜잭션 / 한 bulk_write) 쓴다. 여러 source를 섞어 넣어도 됨.
+        """
+        if not items:
+            return IngestResult(0, [])
+        rows = list({row_key(r): r for r in normalize_items(items)}.values())  # 입력 안의 중복 제거
+        written = self._apply(rows)
+        if written:
+            self._changed(written)
+        return IngestResult(len(written), _changed_days(written))
+
+    @abstractmethod
+    def _apply(self, rows: List[tuple]) -> List[tuple]:
+        """이미 저장된 (source, day, menu)와 비교해서 새 행만 저장하고 실제로 추가된 행 목록 반환"""
+
+    @abstractmethod
+    def fetch_all(self, source: str = DEFAULT_SOURCE) -> List[tuple]:
+        """source의 전체 행 [(day_text, menu), ...]"""
+
+    @abstractmethod
+    def fetch_week(self, week: Optional[str] = None, source: str = DEFAULT_SOURCE) -> tuple:
+        """(week_start, [(day_text, menu, date), ...]), week가 None이면 최신 주"""
+
+    @abstractmethod
+    def fetch_rows(self) -> List[tuple]:
+        """전체 행 [(day, menu, date, week_start, source), ...] (색인을 처음 만들 때 한 번)"""
+
+    @abstractmethod
+    def count(self) -> int:
+        """전체 행 수 (캐시 검증용 지문)"""
+
+    # 크롤러 상태(ETag, 본문 해시, 마지막 실행 기록 등) 저장용 key → dict
+    @abstractmethod
+    def get_meta(self, key: str) -> Optional[dict]:
+        pass
+
+    @abstractmethod
+    def set_meta(self, key: str, value: dict):
+        pass
+
+
+# ---------------- SQLite ----------------
+MENU_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS {name}(
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  source TEXT NOT NULL DEFAULT 'lilac_lunch',
+  day_text TEXT NOT NULL,
+  menu TEXT NOT NULL,
+  date TEXT,
+  week_start TEXT,
+  UNIQUE(source, day_text, menu)
+);
+"""
+SCHEMA_SQL = MENU_TABLE_SQL.format(name="lilac_menu") + """
+CREATE TABLE IF NOT EXISTS crawl_meta(
+  key TEXT PRIMARY KEY,
+  value TEXT NOT NULL
+);
+"""
+# date/week_start: 'YYYY-MM-DD' (크롤링 시점에 라벨에서 계산해 저장, 라벨을 못 읽으면 NULL)
+INDEX_SQL = "CREATE INDEX IF NOT EXISTS idx_lilac_menu_source_week ON lilac_menu(source, week_start, date);"
+
+# 자주 쓰는 쿼리는 상수 문자열로 두어 연결별 statement 캐시에서 재사용되게 함
+INSERT_SQL = "INSERT OR IGNORE INTO lilac_menu(day_text, menu, date, week_start, source) VALUES (?, ?, ?, ?, ?)"
+SELECT_ALL_SQL = "SELECT day_text, menu FROM lilac_menu WHERE source = ?"
+SQLITE_MAX_PARAMS = 500  # IN (...) 한 번에 넣을 라벨 수 (SQLite 변수 개수 제한 대비)
+LATEST_WEEK_SQL = "SELECT MAX(week_start) FROM lilac_menu WHERE source = ?"
+SELECT_WEEK_SQL = "SELECT day_text, menu, date FROM lilac_menu WHERE source = ? AND week_start = ? ORDER BY date, id"
+SELECT_ROWS_SQL = "SELECT day_text, menu, date, week_start, source FROM lilac_menu ORDER BY id"
+COUNT_SQL = "SELECT COUNT(*) FROM lilac_menu"
+GET_META_SQL = "SELECT value FROM crawl_meta WHERE key = ?"
+SET_META_SQL = "INSERT OR REPLACE INTO crawl_meta(key, value) VALUES (?, ?)"
+
+
+class SQLiteRepository(MenuRepository):
+    """연결을 pool_size개까지 만들어 돌려쓰는 SQLite 저장소 (WAL)"""
+    name = "sqlite"
+
+    def __init__(self, path: str, pool_size: int = 4):
+        super().__init__()
+        self.path = path
+        self.pool_size = pool_size
+        self._pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _new_conn(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=3.0, check_same_thread=False, cached_statements=64)
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("PRAGMA busy_timeout=3000;")
+        conn.execute("PRAGMA synchronous=NORMAL;")
+        return conn
+
+    @contextmanager
+    def _conn(self):
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self.pool_size
+                if create:
+                    self._created += 1
+            conn = self._new_conn() if create else self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def init(self):
+        with self._conn() as conn:
+            conn.executescript(SCHEMA_SQL)
+            self._migrate_dates(conn)
+            self._migrate_source(conn)
+            conn.execute(INDEX_SQL)
+            conn.commit()
+
+    @staticmethod
+    def _migrate_dates(conn):
+        """예전 DB(day_text, menu만 있던 테이블)에 날짜 컬럼을 추가하고 기존 행을 채움"""
+        cols = {row[1] for row in conn.execute("PRAGMA table_info(lilac_menu)")}
+        if "date" in cols:
+            return
+        conn.execute("ALTER TABLE lilac_menu ADD COLUMN date TEXT")
+        conn.execute("ALTER TABLE lilac_menu ADD COLUMN week_start TEXT")
+        labels = [r[0] for r in conn.execute("SELECT DISTINCT day_text FROM lilac_menu")]
+        for label in labels:
+            d = resolve_label_date(label)
+            if d:
+                conn.execute("UPDATE lilac_menu SET date = ?, week_start = ? WHERE day_text = ?",
+                             (d.isoformat(), week_start(d).isoformat(), label))
+
+    @staticmethod
+    def _migrate_source(conn):
+        """
+        예전 DB(UNIQUE(day_text, menu))를 source 컬럼이 있는 테이블로 다시 만듦.
+        SQLite는 UNIQUE 제약을 ALTER로 바꿀 수 없어서 새 테이블로 복사 후 교체 (기존 행은 DEFAULT_SOURCE)
+        """
+        cols = {row[1] for row in conn.execute("PRAGMA table_info(lilac_menu)")}
+        if "source" in cols:
+            return
+        conn.commit()
+        conn.execute("BEGIN IMMEDIATE")  # 중간에 죽어도 예전 테이블이 그대로 남도록 한 트랜잭션으로
+        try:
+            conn.execute(MENU_TABLE_SQL.format(name="lilac_menu_new"))
+            conn.execute(
+                "INSERT INTO lilac_menu_new(id, source, day_text, menu, date, week_start) "
+                "SELECT id, ?, day_text, menu, date, week_start FROM lilac_menu", (DEFAULT_SOURCE,))
+            conn.execute("DROP TABLE lilac_menu")  # 예전 인덱스도 같이 삭제됨
+            conn.execute("ALTER TABLE lilac_menu_new RENAME TO lilac_menu")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        print("[INFO] lilac_menu migrated: added source column")
+
+    def _apply(self, rows):
+        # 비교와 쓰기를 BEGIN IMMEDIATE 한 트랜잭션 안에서 → 다른 프로세스가 끼어들 수 없어 delta가 정확함
+        labels = sorted({r[0] for r in rows})
+        with self._conn() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                stored = set()
+                for i in range(0, len(labels), SQLITE_MAX_PARAMS):
+                    chunk = labels[i:i + SQLITE_MAX_PARAMS]
+                    sql = f"SELECT source, day_text, menu FROM lilac_menu WHERE day_text IN ({','.join('?' * len(chunk))})"
+                    stored.update(conn.execute(sql, chunk).fetchall())
+                delta = [r for r in rows if row_key(r) not in stored]
+                conn.executemany(INSERT_SQL, delta)
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+        return delta
+
+    def fetch_all(self, source=DEFAULT_SOURCE):
+        with self._conn() as conn:
+            return conn.execute(SELECT_ALL_SQL, (source,)).fetchall()
+
+    def fetch_week(self, week=None, source=DEFAULT_SOURCE):
+        with self._conn() as conn:
+            if week is None:
+                week = conn.execute(LATEST_WEEK_SQL, (source,)).fetchone()[0]
+            if week is None:
+                return None, []
+            return week, conn.execute(SELECT_WEEK_SQL, (source, week)).fetchall()
+
+    def fetch_rows(self):
+        with self._conn() as conn:
+            return conn.execute(SELECT_ROWS_SQL).fetchall()
+
+    def count(self):
+        with self._conn() as conn:
+            return conn.execute(COUNT_SQL).fetchone()[0]
 
-if not MONGODB_URI:
-    raise RuntimeError("MONGODB_URI not set. Set it in Render → Environment.")
+    def get_meta(self, key):
+        with self._conn() as conn:
+            row = conn.execute(GET_META_SQL, (key,)).fetchone()
+        return json.loads(row[0]) if row else None
 
-_client = MongoClient(MONGODB_URI, serverSelectionTimeoutMS=8000)  # 타임아웃 추가
-_db = _client[DBNAME]
-_col = _db[COLL]
+    def set_meta(self, key, value):
+        with self._conn() as conn:
+            with conn:
+                conn.execute(SET_META_SQL, (key, json.dumps(value, ensure_ascii=False)))
 
+
+# ---------------- MongoDB ----------------
+class MongoRepository(MenuRepository):
+    """프로세스 전체가 MongoClient 하나(내부 커넥션 풀)를 공유"""
+    name = "mongo"
+
+    def __init__(self, uri: str, dbname: str, coll: str, pool_size: int = 20):
+        super().__init__()
+        from pymongo import MongoClient  # Mongo를 안 쓰는 환경에서는 pymongo 없이도 동작하도록
+
+        self._client = MongoClient(uri, serverSelectionTimeoutMS=8000, maxPoolSize=pool_size)  # 타임아웃 추가
+        self._col = self._client[dbname][coll]
+        self._meta = self._client[dbname][META_COLL]
+
+    def init(self):
+        # 연결 확인(초기 1회)
+        self._client.admin.command("ping")
+        self._migrate_source()
+        # source+day_text+menu 유니크
+        self._col.create_index([("source", 1), ("day_text", 1), ("menu", 1)], unique=True)
+        # 주 단위 조회용 (source별 최신 주 = week_start 내림차순 첫 문서)
+        self._col.create_index([("source", 1), ("week_start", -1), ("date", 1)])
+        self._backfill_dates()
+
+    def _migrate_source(self):
+        # 예전 문서에 source 채우고, (day_text, menu) 유니크 인덱스는 끼니가 달라도 충돌하므로 제거
+        self._col.update_many({"source": {"$exists": False}}, {"$set": {"source": DEFAULT_SOURCE}})
+        for name in ("day_text_1_menu_1", "week_start_-1_date_1"):
+            if name in self._col.index_information():
+                self._col.drop_index(name)
+
+    def _backfill_dates(self):
+        # 날짜 필드가 없던 예전 문서 보정 (라벨 단위로 한 번씩만)
+        for label in self._col.distinct("day_text", {"date": {"$exists": False}}):
+            d = resolve_label_date(label)
+            self._col.update_many(
+                {"day_text": label, "date": {"$exists": False}},
+                {"$set": {"date": d.isoformat() if d else None,
+                          "week_start": week_start(d).isoformat() if d else None}},
+            )
+
+    def _apply(self, rows):
+        stored = self._existing(sorted({r[0] for r in rows}))
+        delta = [r for r in rows if row_key(r) not in stored]
+        return self._write(delta) if delta else []
+
+    def _existing(self, labels):
+        """labels에 해당하는 이미 저장된 {(source, day_text, menu)}"""
+        cur = self._col.find({"day_text": {"$in": labels}}, {"_id": 0, "source": 1, "day_text": 1, "menu": 1})
+        return {(doc.get("source", DEFAULT_SOURCE), doc.get("day_text", ""), doc.get("menu", "")) for doc in cur}
+
+    def _write(self, rows):
+        """rows를 저장하고 실제로 추가된 행 목록 반환"""
+        from pymongo import InsertOne
+        from pymongo.errors import BulkWriteError
+
+        ops = [InsertOne({"source": src, "day_text": d, "menu": m, "date": dt, "week_start": ws})
+               for d, m, dt, ws, src in rows]
+        try:
+            self._col.bulk_write(ops, ordered=False)
+            return rows
+        except BulkWriteError as e:
+            # 비교 이후 다른 곳에서 먼저 들어간 행(유니크 충돌)만 빼고 나머지는 저장됨
+            failed = {err["index"] for err in (e.details or {}).get("writeErrors", [])}
+            return [r for i, r in enumerate(rows) if i not in failed]
+
+    def fetch_all(self, source=DEFAULT_SOURCE):
+        # [(day_text, menu), ...] 형태로 반환
+        return [
+            (doc.get("day_text", ""), doc.get("menu", ""))
+            for doc in self._col.find({"source": source}, {"_id": 0, "day_text": 1, "menu": 1})
+        ]
+
+    def fetch_week(self, week=None, source=DEFAULT_SOURCE):
+        if week is None:
+            doc = self._col.find_one({"source": source, "week_start": {"$ne": None}}, {"_id": 0, "week_start": 1},
+                                     sort=[("week_start", -1)])
+            week = doc["week_start"] if doc else None
+        if week is None:
+            return None, []
+        cur = self._col.find({"source": source, "week_start": week}, {"_id": 0, "day_text": 1, "menu": 1, "date": 1})
+        cur = cur.sort([("date", 1), ("_id", 1)])
+        return week, [(doc.get("day_text", ""), doc.get("menu", ""), doc.get("date")) for doc in cur]
+
+    def fetch_rows(self):
+        cur = self._col.find({}, {"_id": 0, "day_text": 1, "menu": 1, "date": 1, "week_start": 1, "source": 1})
+        return [(doc.get("day_text", ""), doc.get("menu", ""), doc.get("date"), doc.get("week_start"),
+                 doc.get("source", DEFAULT_SOURCE)) for doc in cur]
+
+    def count(self):
+        return self._col.estimated_document_count()
+
+    def get_meta(self, key):
+        doc = self._meta.find_one({"_id": key})
+        return doc["value"] if doc else None
+
+    def set_meta(self, key, value):
+        self._meta.replace_one({"_id": key}, {"_id": key, "value": value}, upsert=True)
+
+
+# ---------------- 메모리 (오프라인 개발/부하 테스트용) ----------------
+class MemoryRepository(MenuRepository):
+    name = "memory"
+
+    def __init__(self):
+        super().__init__()
+        self._rows = {}  # {(source, day_text, menu): (date, week_start, 순번)}
+        self._weeks = {}  # {(source, week_start): [(day_text, menu, date, 순번), ...]}
+        self._meta = {}
+        self._lock = threading.Lock()
+
+    def _apply(self, rows):
+        # 비교와 쓰기를 한 락 안에서 (이미 있는 행은 건너뜀)
+        written = []
+        with self._lock:
+            for row in rows:
+                day, menu, d, ws, src = row
+                if row_key(row) in self._rows:
+                    continue
+                seq = len(self._rows)
+                self._rows[row_key(row)] = (d, ws, seq)
+                if ws:
+                    self._weeks.setdefault((src, ws), []).append((day, menu, d, seq))
+                written.append(row)
+        return written
+
+    def fetch_all(self, source=DEFAULT_SOURCE):
+        with self._lock:
+            return [(day, menu) for src, day, menu in self._rows if src == source]
+
+    def fetch_week(self, week=None, source=DEFAULT_SOURCE):
+        with self._lock:
+            if week is None:
+                weeks = [ws for src, ws in self._weeks if src == source]
+                week = max(weeks) if weeks else None
+            if week is None:
+                return None, []
+            rows = sorted(self._weeks.get((source, week), []), key=lambda r: (r[2], r[3]))
+            return week, [(day, menu, d) for day, menu, d, _ in rows]
+
+    def fetch_rows(self):
+        with self._lock:
+            items = sorted(self._rows.items(), key=lambda kv: kv[1][2])
+        return [(day, menu, d, ws, src) for (src, day, menu), (d, ws, _) in items]
+
+    def count(self):
+        return len(self._rows)
+
+    def get_meta(self, key):
+        value = self._meta.get(key)
+        return dict(value) if value is not None else None
+
+    def set_meta(self, key, value):
+        self._meta[key] = dict(value)
+
+
+# ---------------- 백엔드 선택 (프로세스당 1회) ----------------
+_repo: Optional[MenuRepository] = None
+_repo_lock = threading.Lock()
+
+
+def _create_repository() -> MenuRepository:
+    kind = os.getenv("BEREADY_STORAGE") or ("mongo" if MONGODB_URI else "sqlite")
+    if kind == "mongo":
+        if not MONGODB_URI:
+            raise RuntimeError("MONGODB_URI not set. Set it in Render → Environment.")
+        return MongoRepository(MONGODB_URI, DBNAME, COLL, MONGODB_POOL_SIZE)
+    if kind == "memory":
+        return MemoryRepository()
+    if kind == "sqlite":
+        return SQLiteRepository(SQLITE_PATH, SQLITE_POOL_SIZE)
+    raise RuntimeError(f"Unknown BEREADY_STORAGE: {kind}")
+
+
+def get_repository() -> MenuRepository:
+    global _repo
+    if _repo is None:
+        with _repo_lock:
+            if _repo is None:
+                _repo = _create_repository()
+                print(f"[INFO] Menu storage backend: {_repo.name}")
+    return _repo
+
+
+# ---------------- 기존 함수 이름 유지 ----------------
 def init_db():
-    # 연결 확인(초기 1회)
-    _client.admin.command("ping")
-    # day_text+menu 유니크
-    _col.create_index([("day_text", 1), ("menu", 1)], unique=True)
+    get_repository().ensure_init()
+
 
 def upsert(items):
-    if not items:
-        return 0
-    ops = [
-        UpdateOne(
-            {"day_text": d, "menu": m},
-            {"$setOnInsert": {"day_text": d, "menu": m}},
-            upsert=True
-        )
-        for d, m in items
-    ]
-    try:
-        res = _col.bulk_write(ops, ordered=False)
-        return len(res.upserted_ids) if res.upserted_ids else 0
-    except BulkWriteError as e:
-        # 중복 충돌은 무시하고 upsert된 건수만 집계
-        return len((e.details or {}).get("upserted", []) or [])
-
-def fetch_all():
-    # [(day_text, menu), ...] 형태로 반환
-    return [
-        (doc.get("day_text",""), doc.get("menu",""))
-        for doc in _col.find({}, {"_id":0, "day_text":1, "menu":1})
-    ]
+    return get_repository().upsert(items)
+
+
+def ingest(items):
+    return get_repository().ingest(items)
+
+
+def fetch_all(source=DEFAULT_SOURCE):
+    return get_repository().fetch_all(source)
+
+
+def fetch_week(week=None, source=DEFAULT_SOURCE):
+    return get_repository().fetch_week(week, source)
+
+
+def count_all():
+    return get_repository().count()
@@ -0,0 +1,52 @@
+"""
+io_executor.py
+- async 핸들러에서 피할 수 없는 블로킹 작업(SQLite/Mongo 조회 등)을 돌리는 전용 스레드풀
+- Starlette 기본 스레드풀과 분리되어 있어서 느린 DB가 요청 처리 스레드를 다 잡아먹지 않음
+- 실행 중 + 대기 중 작업이 max_workers + max_queue를 넘으면 기다리지 않고 바로 503
+"""
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+IO_WORKERS = int(os.getenv("BEREADY_IO_WORKERS", "8"))
+IO_QUEUE = int(os.getenv("BEREADY_IO_QUEUE", "32"))
+
+
+class BoundedExecutor:
+    def __init__(self, max_workers: int = IO_WORKERS, max_queue: int = IO_QUEUE):
+        self.limit = max_workers + max_queue
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="io")
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _done(self, _fut):
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, fn, *args, **kwargs):
+        with self._lock:
+            if self._pending >= self.limit:
+                self.rejected += 1
+                raise HTTPException(status_code=503, detail="server busy, retry shortly",
+                                    headers={"Retry-After": "1"})
+            self._pending += 1
+        fut = self._pool.submit(functools.partial(fn, *args, **kwargs))
+        fut.add_done_callback(self._done)
+        return await asyncio.wrap_future(fut)
+
+
+executor = BoundedExecutor()
+
+
+async def run_blocking(fn, *args, **kwargs):
+    """fn(*args, **kwargs)를 전용 스레드풀에서 실행하고 결과를 기다림 (포화 시 503)"""
+    return await executor.run(fn, *args, **kwargs)
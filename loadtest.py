@@ -0,0 +1,384 @@
+"""
+loadtest.py
+- API 서빙 경로 부하 테스트 (Mongo / 카메라 / 인터넷 불필요)
+
+    python loadtest.py --concurrency 64 --duration 15
+    python loadtest.py --url http://127.0.0.1:8000 --concurrency 32     # 이미 떠 있는 서버 대상
+    python loadtest.py --paths /api/lilac/menu,/wait --gzip --out report.json
+    python loadtest.py --sse 2000 --sse-ramp 5 --paths /healthz --duration 30   # SSE 구독자 2000명 + 요청
+
+기본 모드는 이 프로세스 안에서 main:app을 uvicorn으로 띄운다.
+- 저장소: 메모리 (fixtures/pknu_view_lilac.html 한 주 + 합성 과거 식단 --weeks주)
+- 추정값: 가짜 감지기가 카메라별 인원수를 발행 → api 역할 워커가 읽는 mmap 파일로 전달
+클라이언트는 asyncio로 keep-alive HTTP/1.1 연결 --concurrency개를 열어 경로를 돌아가며 요청하고
+경로별 RPS, 지연 백분위수(ms), 오류율을 JSON으로 출력한다.
+--sse N이면 /api/lilac/estimation/stream 구독 연결 N개를 (--sse-ramp초에 걸쳐) 같이 열어 두고
+연결 성공/실패, 중간 끊김, 받은 이벤트 수, 첫 이벤트까지 시간, 갱신 지연(이벤트의 updated_at → 수신)을 보고한다.
+같은 프로세스(GIL 공유)에서 측정하므로 절대값보다 변경 전후 비교용.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from urllib.parse import urlsplit
+
+DEFAULT_PATHS = ["/api/lilac/menu", "/api/lilac/estimation", "/wait", "/healthz"]
+SSE_PATH = "/api/lilac/estimation/stream"
+FIXTURE_VIEW = Path(__file__).resolve().parent / "crawler_radhaha" / "fixtures" / "pknu_view_lilac.html"
+
+
+# ---------------- 대역 데이터 / 서버 ----------------
+def prepare_env(tmp: str):
+    # main을 import하기 전에 지정해야 함
+    os.environ.update({
+        "BEREADY_STORAGE": "memory",
+        "BEREADY_ROLE": "api",
+        "BEREADY_SHM_PATH": os.path.join(tmp, "estimation.shm"),
+        "BEREADY_HISTORY_DB": os.path.join(tmp, "history.db"),
+        "BEREADY_SCHEDULER": "0",
+    })
+
+
+def load_fixture_menu(weeks: int) -> int:
+    from crawler_radhaha.beready_crawler import parse_view
+    from crawler_radhaha.db import ingest
+
+    rows = list(parse_view(FIXTURE_VIEW.read_text(encoding="utf-8")) or [])
+    rng = random.Random(0)
+    dishes = [f"메뉴{i}" for i in range(400)]
+    monday = date.fromisoformat(rows[0][2]) if rows else date.today()
+    for w in range(1, weeks + 1):
+        for k in range(5):
+            d = monday - timedelta(weeks=w) + timedelta(days=k)
+            rows += [(f"{d.month}월 {d.day}일", dish, d.isoformat()) for dish in rng.sample(dishes, 6)]
+    return ingest(rows).added
+
+
+def start_fake_detector(shm_path: str, cameras: int = 2, hz: float = 10.0):
+    """카메라별 인원수를 무작위로 움직이며 발행 (실제 추론 프로세스 대신)"""
+    from yolo.beready_estimator import WaitEstimator
+    from yolo.beready_publish import SnapshotPublisher
+    from yolo.beready_shm import ShmWriter
+
+    publisher = SnapshotPublisher(WaitEstimator(cameras, lambda: 20.0))
+    writer = ShmWriter(shm_path)
+    writer.publish(publisher.current())
+    publisher.subscribe(writer.publish)
+
+    def run():
+        rng = random.Random(1)
+        counts = [5] * cameras
+        while True:
+            for cam in range(cameras):
+                counts[cam] = max(0, min(40, counts[cam] + rng.choice((-1, 0, 0, 1))))
+                publisher.publish_count(cam, counts[cam], time.time())
+            writer.publish(publisher.current())  # updated_at 갱신
+            time.sleep(1.0 / hz)
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+def start_server(port: int):
+    import uvicorn
+    from main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning",
+                                           access_log=False))
+    threading.Thread(target=server.run, daemon=True).start()
+    deadline = time.time() + 30
+    while not server.started:
+        if time.time() > deadline:
+            raise RuntimeError("server did not start")
+        time.sleep(0.05)
+    return server
+
+
+# ---------------- 클라이언트 ----------------
+class Stats:
+    def __init__(self):
+        self.latencies = []
+        self.statuses = {}
+        self.errors = 0
+        self.bytes = 0
+
+    def summary(self, seconds: float) -> dict:
+        lat = sorted(self.latencies)
+
+        def pct(p):
+            return round(lat[min(len(lat) - 1, math.ceil(p / 100 * len(lat)) - 1)] * 1000, 3) if lat else None
+
+        total = len(lat) + self.errors
+        bad = self.errors + sum(n for s, n in self.statuses.items() if s >= 400)
+        return {
+            "requests": total, "rps": round(len(lat) / seconds, 1),
+            "p50_ms": pct(50), "p90_ms": pct(90), "p99_ms": pct(99), "max_ms": pct(100),
+            "error_rate": round(bad / total, 4) if total else 0.0,
+            "statuses": {str(k): v for k, v in sorted(self.statuses.items())},
+            "transport_errors": self.errors, "bytes": self.bytes,
+        }
+
+
+async def read_response(reader) -> (int, int):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed")
+    status = int(status_line.split()[1])
+    length, chunked = 0, False
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        name = name.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "transfer-encoding" and "chunked" in value.lower():
+            chunked = True
+    if chunked:
+        size = 0
+        while True:
+            n = int((await reader.readline()).strip(), 16)
+            await reader.readexactly(n + 2)
+            size += n
+            if n == 0:
+                return status, size
+    await reader.readexactly(length)
+    return status, length
+
+
+async def worker(host, port, paths, stop_at, stats, extra_headers, offset):
+    reader = writer = None
+    i = offset
+    while time.perf_counter() < stop_at:
+        path = paths[i % len(paths)]
+        i += 1
+        req = f"GET {path} HTTP/1.1\r\nHost: {host}\r\n{extra_headers}\r\n".encode()
+        started = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            writer.write(req)
+            status, size = await read_response(reader)
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError):
+            stats[path].errors += 1
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            await asyncio.sleep(0.01)
+            continue
+        stats[path].latencies.append(time.perf_counter() - started)
+        stats[path].statuses[status] = stats[path].statuses.get(status, 0) + 1
+        stats[path].bytes += size
+    if writer is not None:
+        writer.close()
+
+
+class SseStats:
+    def __init__(self, subscribers):
+        self.subscribers = subscribers
+        self.connected = 0
+        self.connect_failures = 0
+        self.disconnects = 0  # 측정이 끝나기 전에 서버 쪽에서 끊긴 연결
+        self.events = 0
+        self.pings = 0
+        self.first_event = []  # 접속 → 첫 이벤트(초)
+        self.lag = []  # 이벤트의 updated_at → 수신(초)
+        self.per_subscriber = []
+
+    def summary(self, seconds: float) -> dict:
+        def pct(data, p):
+            data = sorted(data)
+            return round(data[min(len(data) - 1, math.ceil(p / 100 * len(data)) - 1)] * 1000, 1) if data else None
+
+        per = self.per_subscriber or [0]
+        return {
+            "subscribers": self.subscribers, "connected": self.connected,
+            "connect_failures": self.connect_failures, "disconnects": self.disconnects,
+            "events": self.events, "events_per_s": round(self.events / seconds, 1), "pings": self.pings,
+            "events_per_subscriber": {"min": min(per), "max": max(per), "avg": round(sum(per) / len(per), 1)},
+            "first_event_p50_ms": pct(self.first_event, 50), "first_event_p99_ms": pct(self.first_event, 99),
+            "update_lag_p50_ms": pct(self.lag, 50), "update_lag_p99_ms": pct(self.lag, 99),
+            "update_lag_max_ms": pct(self.lag, 100),
+        }
+
+
+async def _read_chunks(reader, chunked):
+    """응답 본문을 조각 단위로 (Transfer-Encoding: chunked면 풀어서)"""
+    while True:
+        if not chunked:
+            data = await reader.read(65536)
+            if not data:
+                return
+            yield data
+            continue
+        n = int((await reader.readline()).strip() or b"0", 16)
+        if n == 0:
+            return
+        data = await reader.readexactly(n + 2)
+        yield data[:-2]
+
+
+async def sse_subscriber(host, port, start_at, stop_at, stats: SseStats):
+    await asyncio.sleep(max(0.0, start_at - time.perf_counter()))
+    opened = time.perf_counter()
+    writer = None
+    received = 0
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(f"GET {SSE_PATH} HTTP/1.1\r\nHost: {host}\r\nAccept: text/event-stream\r\n\r\n".encode())
+        status_line = await reader.readline()
+        if not status_line or int(status_line.split()[1]) != 200:
+            raise ConnectionError(f"bad status: {status_line!r}")
+        chunked = False
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "transfer-encoding" and "chunked" in value.lower():
+                chunked = True
+        stats.connected += 1
+
+        buf = b""
+        chunks = _read_chunks(reader, chunked)
+        while True:
+            remaining = stop_at - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                data = await asyncio.wait_for(chunks.__anext__(), remaining)
+            except asyncio.TimeoutError:
+                break
+            except StopAsyncIteration:
+                stats.disconnects += 1
+                break
+            buf += data
+            while b"\n\n" in buf:
+                block, buf = buf.split(b"\n\n", 1)
+                if block.startswith(b":"):
+                    stats.pings += 1
+                    continue
+                now = time.time()
+                if received == 0:
+                    stats.first_event.append(time.perf_counter() - opened)
+                received += 1
+                stats.events += 1
+                for line in block.split(b"\n"):
+                    if line.startswith(b"data:"):
+                        updated_at = json.loads(line[5:]).get("updated_at")
+                        if updated_at and received > 1:  # 첫 이벤트는 접속 시점의 기존 값
+                            stats.lag.append(max(0.0, now - updated_at))
+    except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError) as e:
+        if stats.connected and received:
+            stats.disconnects += 1
+        else:
+            stats.connect_failures += 1
+            if stats.connect_failures <= 3:
+                print(f"[WARN] SSE subscriber failed: {e}", file=sys.stderr)
+    finally:
+        stats.per_subscriber.append(received)
+        if writer is not None:
+            writer.close()
+
+
+async def drive(base_url, paths, concurrency, duration, warmup, gzip, sse=0, sse_ramp=0.0):
+    parts = urlsplit(base_url)
+    host, port = parts.hostname, parts.port or 80
+    extra = "Accept-Encoding: gzip, br\r\n" if gzip else ""
+    if not paths:
+        concurrency = 0  # SSE만
+
+    if warmup > 0 and concurrency:
+        scratch = {p: Stats() for p in paths}
+        end = time.perf_counter() + warmup
+        await asyncio.gather(*[worker(host, port, paths, end, scratch, extra, i) for i in range(concurrency)])
+
+    stats = {p: Stats() for p in paths}
+    sse_stats = SseStats(sse)
+    started = time.perf_counter()
+    tasks = [worker(host, port, paths, started + duration, stats, extra, i) for i in range(concurrency)]
+    # 구독자는 sse_ramp초에 걸쳐 나눠서 접속 (한꺼번에 SYN이 몰리면 listen backlog를 넘음)
+    tasks += [sse_subscriber(host, port, started + sse_ramp * i / max(sse, 1), started + duration, sse_stats)
+              for i in range(sse)]
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    overall = Stats()
+    for s in stats.values():
+        overall.latencies += s.latencies
+        overall.errors += s.errors
+        overall.bytes += s.bytes
+        for k, v in s.statuses.items():
+            overall.statuses[k] = overall.statuses.get(k, 0) + v
+    report = {
+        "target": base_url, "concurrency": concurrency, "duration_s": round(elapsed, 2), "gzip": gzip,
+        "overall": overall.summary(elapsed),
+        "endpoints": {p: s.summary(elapsed) for p, s in stats.items()},
+    }
+    if sse:
+        report["sse"] = sse_stats.summary(elapsed)
+    return report
+
+
+def raise_fd_limit(needed: int):
+    """구독자 연결 수만큼 파일 디스크립터가 필요 (서버를 같은 프로세스에서 띄우면 연결당 2개)"""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(needed, hard), hard))
+        if hard < needed:
+            print(f"[WARN] fd limit {hard} < {needed}, some SSE connections will fail", file=sys.stderr)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="load test the beready API")
+    ap.add_argument("--url", help="target an already running server instead of starting one")
+    ap.add_argument("--port", type=int, default=8765, help="port for the in-process server")
+    ap.add_argument("--paths", default=",".join(DEFAULT_PATHS))
+    ap.add_argument("--concurrency", type=int, default=32)
+    ap.add_argument("--duration", type=float, default=10.0)
+    ap.add_argument("--warmup", type=float, default=2.0)
+    ap.add_argument("--weeks", type=int, default=104, help="weeks of synthetic menu history")
+    ap.add_argument("--gzip", action="store_true", help="send Accept-Encoding: gzip, br")
+    ap.add_argument("--sse", type=int, default=0, help=f"keep N subscribers connected to {SSE_PATH}")
+    ap.add_argument("--sse-ramp", type=float, default=2.0, help="seconds over which SSE subscribers connect")
+    ap.add_argument("--max-error-rate", type=float, default=None, help="exit 1 if overall error rate exceeds this")
+    ap.add_argument("--out", help="also write the JSON report to this file")
+    args = ap.parse_args(argv)
+
+    base_url = args.url
+    if not base_url:
+        tmp = tempfile.mkdtemp(prefix="beready-load-")
+        prepare_env(tmp)
+        rows = load_fixture_menu(args.weeks)
+        start_fake_detector(os.environ["BEREADY_SHM_PATH"])
+        start_server(args.port)
+        base_url = f"http://127.0.0.1:{args.port}"
+        print(f"[INFO] in-process server on {base_url} ({rows} menu rows)", file=sys.stderr)
+
+    paths = [p.strip() for p in args.paths.split(",") if p.strip()]
+    if args.sse:
+        raise_fd_limit(2 * (args.sse + args.concurrency) + 256)
+    report = asyncio.run(drive(base_url, paths, args.concurrency, args.duration, args.warmup, args.gzip,
+                               args.sse, args.sse_ramp))
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+    if args.max_error_rate is not None and report["overall"]["error_rate"] > args.max_error_rate:
+        return 1
+    if args.max_error_rate is not None and args.sse and report["sse"]["connect_failures"] + report["sse"]["disconnects"] > args.max_error_rate * args.sse:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
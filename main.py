@@ -1,15 +1,17 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 import threading
 import uvicorn
 import time  # ✅ 추가 (time.sleep 때문에 필요)
 
 # 모듈 import
-from crawler_radhaha import beready_crawler_core, beready_crawler
-from crawler_radhaha.beready_crawler import crawl_once
-from yolo.main_yolo import router as yolo_router, start_yolo_threads
+from crawler_radhaha import beready_crawler_core, beready_crawler, beready_search
+from crawler_radhaha.beready_jobs import runner as job_runner, submit_crawl
+from crawler_radhaha.beready_scheduler import start_scheduler, stop_scheduler
+from yolo.main_yolo import ROLE, router as yolo_router, start_yolo_threads
 
-from crawler_radhaha.db import init_db, upsert  # ✅ MongoDB 초기화 함수
+from crawler_radhaha.db import init_db, upsert, get_repository  # ✅ MongoDB 초기화 함수
 
 app = FastAPI()
 
@@ -31,6 +33,8 @@ def startup_event():
     # ✅ MongoDB 초기화 추가
     init_db()
     print("✅ MongoDB/DB 초기화 완료")
+    start_scheduler()  # 주간 식단 크롤링 (별도 스케줄러 프로세스 불필요)
+    beready_search.index.ensure_built()  # 메뉴 검색 색인 (이후에는 ingest가 증분 갱신)
 
     def delayed_start():
         time.sleep(1)
@@ -42,10 +46,28 @@ def startup_event():
 
     threading.Thread(target=delayed_start, daemon=True).start()
 
+@app.get("/healthz")
+async def healthz():
+    # 로드밸런서/부하 테스트용: 외부 I/O 없이 프로세스 상태만
+    return {"ok": True, "role": ROLE, "storage": get_repository().name}
+
+@app.on_event("shutdown")
+def shutdown_event():
+    stop_scheduler()
+
 @app.get("/trigger")
-def trigger_crawl():
-    added = crawl_once()
-    return {"added": added}
+async def trigger_crawl(force: bool = False):
+    # 크롤링은 백그라운드 작업으로 → 진행 중이면 그 작업에 합류, 방금 끝났으면 그 결과를 돌려줌
+    job, joined = submit_crawl(force)
+    body = dict(job.to_dict(), joined=joined)
+    return JSONResponse(body, status_code=200 if job.status != "running" else 202)
+
+@app.get("/trigger/{job_id}")
+async def trigger_status(job_id: str):
+    job = job_runner.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="job not found")
+    return job.to_dict()
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
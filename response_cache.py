@@ -0,0 +1,117 @@
+"""
+response_cache.py
+- 읽기 API 응답을 'JSON 바이트 + gzip/br 압축본'으로 미리 만들어 두는 캐시
+- 데이터 버전(스냅샷 version, DB 행 수 등)이 같으면 직렬화/검증/압축 없이 그대로 보냄
+- If-None-Match가 맞으면 304, Accept-Encoding에 맞춰 br > gzip > 원본 중 하나를 고름
+- ETag는 인코딩마다 다름 ("abc", "abc-gzip", "abc-br"): 강한 ETag는 바이트가 같을 때만 같아야 하므로
+- orjson / brotli가 설치되어 있으면 사용 (없으면 json / gzip만)
+"""
+import gzip
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Hashable, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # 선택 의존성
+    brotli = None
+
+MIN_COMPRESS = 512  # 이보다 작은 응답은 압축해도 이득이 거의 없음
+
+
+def dumps(data: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class Encoded:
+    """한 버전의 응답 본문과 압축본 (만든 뒤에는 바꾸지 않음). etag는 원본 기준, 압축본은 encoding_etag()"""
+    __slots__ = ("version", "etag", "identity", "gzip", "br")
+
+    def __init__(self, version: Hashable, data: Any):
+        body = dumps(data)
+        self.version = version
+        self.etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+        self.identity = body
+        self.gzip = gzip.compress(body, 6) if len(body) >= MIN_COMPRESS else None
+        self.br = brotli.compress(body, quality=5) if brotli is not None and len(body) >= MIN_COMPRESS else None
+
+
+class ResponseCache:
+    """
+    엔드포인트 하나의 최신 응답. get(version, build)은 버전이 바뀌었을 때만 build()를 불러 다시 인코딩.
+    여러 요청이 동시에 새 버전을 만나도 인코딩은 한 번만 함.
+    """
+
+    def __init__(self):
+        self._entry: Optional[Encoded] = None
+        self._lock = threading.Lock()
+
+    def get(self, version: Hashable, build: Callable[[], Any]) -> Encoded:
+        entry = self._entry
+        if entry is not None and entry.version == version:
+            return entry
+        with self._lock:
+            entry = self._entry
+            if entry is None or entry.version != version:
+                entry = self._entry = Encoded(version, build())
+            return entry
+
+    def invalidate(self):
+        self._entry = None
+
+
+def encoding_etag(etag: str, coding: Optional[str]) -> str:
+    """원본 ETag '"abc"' → 인코딩별 ETag '"abc-gzip"' (원본은 그대로)"""
+    return etag if coding is None else f'{etag[:-1]}-{coding}"'
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """If-None-Match는 약한 비교: W/ 유무는 무시. 같은 내용의 다른 인코딩 ETag도 일치로 봄"""
+    if not header:
+        return False
+    tags = {t.strip()[2:] if t.strip().startswith("W/") else t.strip() for t in header.split(",")}
+    return "*" in tags or any(encoding_etag(etag, c) in tags for c in (None, "gzip", "br"))
+
+
+def _accepts(header: str, coding: str) -> bool:
+    """Accept-Encoding에 coding이 q>0으로 들어 있는지 ('gzip;q=0'은 거부)"""
+    for part in header.lower().split(","):
+        name, *params = [p.strip() for p in part.split(";")]
+        if name != coding:
+            continue
+        q = 1.0
+        for p in params:
+            if p.startswith("q="):
+                try:
+                    q = float(p[2:])
+                except ValueError:
+                    q = 0.0
+        return q > 0
+    return False
+
+
+def respond(request: Request, entry: Encoded, cache_control: str = "no-cache") -> Response:
+    accept = request.headers.get("accept-encoding", "")
+    if entry.br is not None and _accepts(accept, "br"):
+        coding, body = "br", entry.br
+    elif entry.gzip is not None and _accepts(accept, "gzip"):
+        coding, body = "gzip", entry.gzip
+    else:
+        coding, body = None, entry.identity
+    headers = {"ETag": encoding_etag(entry.etag, coding), "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    if coding is not None:
+        headers["Content-Encoding"] = coding
+    return Response(body, media_type="application/json", headers=headers)
@@ -0,0 +1,221 @@
+"""
+BYTETracker 단독 성능 벤치마크 (torch / cv2 / 영상 파일 불필요)
+
+    python -m tracker.benchmark --targets 10,100,1000 --frames 200
+
+합성 군중(이동, 가림 구간, 점수 분포, 미검출)을 만들어 update() 지연 백분위수와
+프레임당 메모리 할당량, 그리고 ID switch 수를 함께 출력한다.
+속도 개선이 추적 품질을 몰래 깨뜨리지 않도록 --max-id-switches로 기준을 걸 수 있다.
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from tracker.basetrack import BaseTrack
+from tracker.byte_tracker import BYTETracker
+from tracker.matching import bbox_ious, linear_assignment
+
+
+class TrackerArgs:  # beready_tracker.start_tracker()의 설정과 동일
+    track_thresh = 0.5
+    track_buffer = 30
+    match_thresh = 0.8
+    aspect_ratio_thresh = 3.0
+    min_box_area = 10
+    mot20 = False
+
+
+class SyntheticCrowd:
+    """
+    사람 수가 일정한 합성 장면. 화면 밖으로 나간 사람은 새 GT ID로 반대편에서 다시 들어온다.
+    step()은 (detections[x1,y1,x2,y2,score], gt_boxes, gt_ids)를 반환한다.
+    """
+
+    def __init__(self, people, speed=2.0, miss_rate=0.05, low_score_rate=0.15,
+                 occlusion_every=60, occlusion_len=8, occlusion_frac=0.3, seed=0):
+        self.rng = np.random.default_rng(seed)
+        self.people = people
+        self.speed = speed
+        self.miss_rate = miss_rate
+        self.low_score_rate = low_score_rate
+        self.occlusion_every = occlusion_every
+        self.occlusion_len = occlusion_len
+        self.occlusion_frac = occlusion_frac
+
+        # 사람 수에 맞춰 화면을 키워서 밀도를 비슷하게 유지
+        side = int(np.ceil(np.sqrt(people)))
+        self.width = max(640, side * 120)
+        self.height = max(360, side * 160)
+
+        self.size = np.column_stack([
+            self.rng.uniform(30, 50, people),   # w
+            self.rng.uniform(80, 120, people),  # h
+        ])
+        self.pos = np.column_stack([
+            self.rng.uniform(0, self.width, people),
+            self.rng.uniform(0, self.height, people),
+        ])
+        self.vel = self.rng.normal(0, speed, (people, 2))
+        self.ids = np.arange(people)
+        self._next_id = people
+        self.frame = 0
+        self.occluded = np.zeros(people, dtype=bool)
+
+    def step(self):
+        self.frame += 1
+        rng = self.rng
+
+        # 등속 운동 + 약간의 랜덤 가속
+        self.vel += rng.normal(0, self.speed * 0.1, self.vel.shape)
+        self.pos += self.vel
+
+        # 화면 밖으로 나간 사람 → 새 사람으로 교체
+        out = ((self.pos[:, 0] < 0) | (self.pos[:, 0] > self.width) |
+               (self.pos[:, 1] < 0) | (self.pos[:, 1] > self.height))
+        n_out = int(out.sum())
+        if n_out:
+            self.pos[out, 0] = np.mod(self.pos[out, 0], self.width)
+            self.pos[out, 1] = np.mod(self.pos[out, 1], self.height)
+            self.ids[out] = np.arange(self._next_id, self._next_id + n_out)
+            self._next_id += n_out
+
+        # 가림 구간: occlusion_every 프레임마다 일부 인원이 occlusion_len 프레임 동안 사라짐
+        if self.occlusion_every and self.frame % self.occlusion_every == 0:
+            self.occluded = rng.random(self.people) < self.occlusion_frac
+        elif self.occlusion_every and self.frame % self.occlusion_every == self.occlusion_len:
+            self.occluded[:] = False
+
+        tl = self.pos - self.size / 2
+        gt = np.column_stack([tl, tl + self.size])
+
+        visible = ~self.occluded & (rng.random(self.people) >= self.miss_rate)
+        # 점수: 대부분 고신뢰(0.6~0.95), 일부는 ByteTrack 2차 매칭 구간(0.1~0.5)
+        low = rng.random(self.people) < self.low_score_rate
+        scores = np.where(low, rng.uniform(0.1, 0.5, self.people), rng.uniform(0.6, 0.95, self.people))
+        jitter = rng.normal(0, 1.5, gt.shape)
+
+        dets = np.column_stack([gt + jitter, scores])[visible].astype(np.float32)
+        return dets, gt, self.ids.copy()
+
+
+def count_id_switches(state, gt_boxes, gt_ids, tracks, iou_thresh=0.5):
+    """
+    GT와 트랙을 IoU로 1:1 매칭하고, 같은 GT에 붙은 트랙 ID가 바뀐 횟수를 센다.
+    state: {gt_id: 마지막으로 매칭된 track_id} (호출 사이에 유지)
+    반환값: (이번 프레임 switch 수, 매칭된 GT 수)
+    """
+    if not len(tracks) or not len(gt_boxes):
+        return 0, 0
+    track_boxes = np.asarray([t.tlbr for t in tracks], dtype=float)
+    cost = 1 - bbox_ious(np.asarray(gt_boxes, dtype=float), track_boxes)
+    matches, _, _ = linear_assignment(cost, thresh=1 - iou_thresh)
+
+    switches = 0
+    for ig, it in matches:
+        gid = int(gt_ids[ig])
+        tid = tracks[it].track_id
+        prev = state.get(gid)
+        if prev is not None and prev != tid:
+            switches += 1
+        state[gid] = tid
+    return switches, len(matches)
+
+
+def run_case(people, frames, warmup, trace_alloc, **crowd_kwargs):
+    BaseTrack._count = 0
+    crowd = SyntheticCrowd(people, **crowd_kwargs)
+    tracker = BYTETracker(TrackerArgs())
+    img = [crowd.height, crowd.width]
+
+    latencies = []
+    alloc_peaks = []
+    id_state = {}
+    switches = 0
+    matched = 0
+    gt_total = 0
+
+    if trace_alloc:
+        tracemalloc.start()
+
+    for i in range(warmup + frames):
+        dets, gt, gt_ids = crowd.step()
+        if trace_alloc:
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        t0 = time.perf_counter()
+        online = tracker.update(dets, img, img)
+        dt = time.perf_counter() - t0
+        if trace_alloc:
+            alloc_peaks.append(tracemalloc.get_traced_memory()[1] - base)
+
+        sw, m = count_id_switches(id_state, gt, gt_ids, online)
+        if i >= warmup:
+            latencies.append(dt)
+            switches += sw
+            matched += m
+            gt_total += len(gt)
+
+    if trace_alloc:
+        tracemalloc.stop()
+
+    lat_ms = np.asarray(latencies) * 1000
+    result = {
+        "targets": people,
+        "frames": frames,
+        "p50_ms": round(float(np.percentile(lat_ms, 50)), 3),
+        "p90_ms": round(float(np.percentile(lat_ms, 90)), 3),
+        "p99_ms": round(float(np.percentile(lat_ms, 99)), 3),
+        "max_ms": round(float(lat_ms.max()), 3),
+        "fps": round(1000 / float(lat_ms.mean()), 1),
+        "id_switches": switches,
+        "recall": round(matched / gt_total, 4) if gt_total else 0.0,
+    }
+    if trace_alloc:
+        peaks = np.asarray(alloc_peaks[warmup:]) / 1024
+        result["alloc_peak_kib_mean"] = round(float(peaks.mean()), 1)
+        result["alloc_peak_kib_max"] = round(float(peaks.max()), 1)
+    return result
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="BYTETracker synthetic throughput benchmark")
+    p.add_argument("--targets", default="10,100,1000", help="동시 인원 수 목록 (쉼표 구분)")
+    p.add_argument("--frames", type=int, default=200)
+    p.add_argument("--warmup", type=int, default=20)
+    p.add_argument("--speed", type=float, default=2.0, help="프레임당 이동 속도(px) 표준편차")
+    p.add_argument("--miss-rate", type=float, default=0.05, help="무작위 미검출 확률")
+    p.add_argument("--low-score-rate", type=float, default=0.15, help="저신뢰 검출 비율")
+    p.add_argument("--occlusion-every", type=int, default=60, help="가림 구간 주기(프레임), 0이면 없음")
+    p.add_argument("--occlusion-len", type=int, default=8)
+    p.add_argument("--occlusion-frac", type=float, default=0.3)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--no-alloc", action="store_true", help="tracemalloc 측정 끄기(지연 측정이 더 정확해짐)")
+    p.add_argument("--max-id-switches", type=float, default=None,
+                   help="GT 1만 (인원x프레임)당 허용 ID switch 수, 넘으면 exit code 1")
+    args = p.parse_args(argv)
+
+    results = []
+    failed = False
+    for n in (int(x) for x in args.targets.split(",") if x.strip()):
+        r = run_case(
+            n, args.frames, args.warmup, not args.no_alloc,
+            speed=args.speed, miss_rate=args.miss_rate, low_score_rate=args.low_score_rate,
+            occlusion_every=args.occlusion_every, occlusion_len=args.occlusion_len,
+            occlusion_frac=args.occlusion_frac, seed=args.seed,
+        )
+        r["id_switches_per_10k"] = round(r["id_switches"] * 1e4 / (n * args.frames), 3)
+        if args.max_id_switches is not None and r["id_switches_per_10k"] > args.max_id_switches:
+            r["failed"] = True
+            failed = True
+        results.append(r)
+        print(json.dumps(r), flush=True)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
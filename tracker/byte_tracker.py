@@ -3,8 +3,6 @@ from collections import deque
 import os
 import os.path as osp
 import copy
-import torch
-import torch.nn.functional as F
 
 from .kalman_filter import KalmanFilter
 from tracker import matching
@@ -15,7 +13,7 @@ class STrack(BaseTrack):
     def __init__(self, tlwh, score):
 
         # wait activate
-        self._tlwh = np.asarray(tlwh, dtype=np.float)
+        self._tlwh = np.asarray(tlwh, dtype=float)
         self.kalman_filter = None
         self.mean, self.covariance = None, None
         self.is_activated = False
@@ -1,4 +1,3 @@
-import cv2
 import numpy as np
 import scipy
 import lap
@@ -8,17 +7,17 @@ from tracker import kalman_filter
 import time
 
 def bbox_ious(boxes1, boxes2):
-    """NumPy로 IoU 계산"""
-    inter_x1 = np.maximum(boxes1[:, 0], boxes2[:, 0])
-    inter_y1 = np.maximum(boxes1[:, 1], boxes2[:, 1])
-    inter_x2 = np.minimum(boxes1[:, 2], boxes2[:, 2])
-    inter_y2 = np.minimum(boxes1[:, 3], boxes2[:, 3])
+    """NumPy로 IoU 계산 (N개 x M개 쌍별 행렬 반환)"""
+    inter_x1 = np.maximum(boxes1[:, None, 0], boxes2[None, :, 0])
+    inter_y1 = np.maximum(boxes1[:, None, 1], boxes2[None, :, 1])
+    inter_x2 = np.minimum(boxes1[:, None, 2], boxes2[None, :, 2])
+    inter_y2 = np.minimum(boxes1[:, None, 3], boxes2[None, :, 3])
 
     inter_area = np.maximum(0, inter_x2 - inter_x1) * np.maximum(0, inter_y2 - inter_y1)
     area1 = (boxes1[:, 2] - boxes1[:, 0]) * (boxes1[:, 3] - boxes1[:, 1])
     area2 = (boxes2[:, 2] - boxes2[:, 0]) * (boxes2[:, 3] - boxes2[:, 1])
 
-    return inter_area / (area1 + area2 - inter_area + 1e-6)
+    return inter_area / (area1[:, None] + area2[None, :] - inter_area + 1e-6)
 
 
 def merge_matches(m1, m2, shape):
@@ -71,13 +70,13 @@ def ious(atlbrs, btlbrs):
 
     :rtype ious np.ndarray
     """
-    ious = np.zeros((len(atlbrs), len(btlbrs)), dtype=np.float)
+    ious = np.zeros((len(atlbrs), len(btlbrs)), dtype=float)
     if ious.size == 0:
         return ious
 
     ious = bbox_ious(
-        np.ascontiguousarray(atlbrs, dtype=np.float),
-        np.ascontiguousarray(btlbrs, dtype=np.float)
+        np.ascontiguousarray(atlbrs, dtype=float),
+        np.ascontiguousarray(btlbrs, dtype=float)
     )
 
     return ious
@@ -131,13 +130,13 @@ def embedding_distance(tracks, detections, metric='cosine'):
     :return: cost_matrix np.ndarray
     """
 
-    cost_matrix = np.zeros((len(tracks), len(detections)), dtype=np.float)
+    cost_matrix = np.zeros((len(tracks), len(detections)), dtype=float)
     if cost_matrix.size == 0:
         return cost_matrix
-    det_features = np.asarray([track.curr_feat for track in detections], dtype=np.float)
+    det_features = np.asarray([track.curr_feat for track in detections], dtype=float)
     #for i, track in enumerate(tracks):
         #cost_matrix[i, :] = np.maximum(0.0, cdist(track.smooth_feat.reshape(1,-1), det_features, metric))
-    track_features = np.asarray([track.smooth_feat for track in tracks], dtype=np.float)
+    track_features = np.asarray([track.smooth_feat for track in tracks], dtype=float)
     cost_matrix = np.maximum(0.0, cdist(track_features, det_features, metric))  # Nomalized features
     return cost_matrix
 
@@ -0,0 +1,154 @@
+import os
+import threading
+import time
+from collections import deque
+
+TOTAL_FPS = float(os.getenv("BEREADY_INFER_FPS", "12"))  # 감지 카메라(video_paths)를 합친 초당 추론 횟수 (추적기는 별도)
+MIN_FPS = float(os.getenv("BEREADY_INFER_MIN_FPS", "0.5"))  # 비어 있거나 정지된 카메라도 최소 이만큼은 봄
+MAX_FPS = float(os.getenv("BEREADY_INFER_MAX_FPS", "10"))  # 한 카메라가 받을 수 있는 최대치
+
+# 우선순위 = W_QUEUE * 대기열 + W_VOLATILITY * 변동성 + W_STALE * 오래됨 (각 항은 0~1로 정규화)
+W_QUEUE = 1.0
+W_VOLATILITY = 1.0
+W_STALE = 0.5
+QUEUE_HALF = 5.0  # 평균 인원이 이 값이면 대기열 항 0.5
+VOLATILITY_HALF = 1.0  # 관측마다 평균 이 정도씩 바뀌면 변동성 항 0.5
+STALE_AFTER = 10.0  # 마지막 결과가 이 초만큼 오래되면 오래됨 항 1.0
+
+
+class _Participant:
+    def __init__(self, key, now):
+        self.key = key
+        self.allocated = MIN_FPS
+        self.next_at = now
+        self.count = None  # 마지막 인원수
+        self.level = 0.0  # 인원수 EWMA
+        self.volatility = 0.0  # |인원수 변화| EWMA
+        self.last_result = now  # 등록 직후는 오래되지 않은 것으로 봄
+        self.results = deque(maxlen=64)  # 최근 결과 시각 (실제 fps 계산용)
+        self.priority = 0.0
+
+
+class InferenceBudget:
+    """
+    고정된 추론 용량(total_fps)을 카메라별로 우선순위에 따라 나눠 주는 스케줄러.
+    - 카메라 스레드: 프레임마다 acquire(key)로 자기 차례를 기다리고, 결과가 나오면 report(key, count, ts)
+    - rebalance_interval초마다 우선순위(대기열 길이, 인원수 변동성, 마지막 결과의 오래됨)를 다시 계산해서
+      각자 min_fps를 먼저 받고 남는 용량을 우선순위 비율로 나눔 (max_fps 넘는 몫은 다른 카메라로 재분배)
+    - 카메라가 늘어나면 바쁜 카메라 몫은 유지되고 한산한 카메라가 먼저 최소치로 내려감
+    """
+
+    def __init__(self, total_fps=TOTAL_FPS, min_fps=MIN_FPS, max_fps=MAX_FPS, rebalance_interval=1.0,
+                 smoothing=0.2, window=5.0):
+        self.total_fps = total_fps
+        self.min_fps = min_fps
+        self.max_fps = max_fps
+        self.rebalance_interval = rebalance_interval
+        self.smoothing = smoothing  # 인원수/변동성 EWMA 계수 (관측 1회당)
+        self.window = window  # 실제 fps를 계산할 최근 구간(초)
+        self._parts = {}
+        self._lock = threading.Lock()
+        self._last_rebalance = 0.0
+
+    def register(self, key):
+        with self._lock:
+            if key not in self._parts:
+                self._parts[key] = _Participant(key, time.time())
+                self._rebalance(time.time())
+
+    def unregister(self, key):
+        with self._lock:
+            if self._parts.pop(key, None) is not None:
+                self._rebalance(time.time())
+
+    def acquire(self, key):
+        """key의 다음 추론 차례까지 대기 (할당된 fps 간격). 추론이 간격보다 느리면 바로 반환"""
+        now = time.time()
+        with self._lock:
+            p = self._parts.get(key)
+            if p is None:
+                p = self._parts[key] = _Participant(key, now)
+                self._rebalance(now)
+            elif now - self._last_rebalance >= self.rebalance_interval:
+                self._rebalance(now)
+            due = max(p.next_at, now)  # 밀린 차례는 몰아서 쓰지 않음
+            p.next_at = due + 1.0 / p.allocated
+        if due > now:
+            time.sleep(due - now)
+
+    def report(self, key, count, ts=None):
+        """추론 결과(인원수)를 알려줌 → 다음 재분배 때 우선순위에 반영"""
+        ts = ts or time.time()
+        with self._lock:
+            p = self._parts.get(key)
+            if p is None:
+                return
+            if p.count is None:
+                p.level = float(count)
+            else:
+                a = self.smoothing
+                p.level += a * (count - p.level)
+                p.volatility += a * (abs(count - p.count) - p.volatility)
+            p.count = count
+            p.last_result = ts
+            p.results.append(ts)
+
+    def _score(self, p, now):
+        queue = p.level / (p.level + QUEUE_HALF)
+        vol = p.volatility / (p.volatility + VOLATILITY_HALF)
+        stale = min((now - p.last_result) / STALE_AFTER, 1.0)
+        return W_QUEUE * queue + W_VOLATILITY * vol + W_STALE * stale
+
+    def _rebalance(self, now):
+        """락을 잡은 상태에서 호출"""
+        self._last_rebalance = now
+        parts = list(self._parts.values())
+        if not parts:
+            return
+        floor = min(self.min_fps, self.total_fps / len(parts))  # 최소치 합이 총량을 넘으면 똑같이 줄임
+        for p in parts:
+            p.priority = self._score(p, now)
+            p.allocated = floor
+
+        # 남는 용량을 우선순위 비율로 분배, max_fps에 걸린 카메라의 초과분은 나머지에게 다시 분배
+        spare = self.total_fps - floor * len(parts)
+        open_parts = [p for p in parts if p.allocated < self.max_fps]
+        while spare > 1e-6 and open_parts:
+            weight = sum(p.priority for p in open_parts)
+            capped = []
+            for p in open_parts:
+                share = spare * (p.priority / weight if weight > 0 else 1.0 / len(open_parts))
+                if p.allocated + share >= self.max_fps:
+                    capped.append(p)
+            if not capped:
+                for p in open_parts:
+                    p.allocated += spare * (p.priority / weight if weight > 0 else 1.0 / len(open_parts))
+                break
+            for p in capped:
+                spare -= self.max_fps - p.allocated
+                p.allocated = self.max_fps
+            open_parts = [p for p in open_parts if p not in capped]
+
+    def _achieved(self, p, now):
+        recent = [t for t in p.results if now - t <= self.window]
+        if len(recent) < 2:
+            return 0.0
+        return round((len(recent) - 1) / max(now - recent[0], 1e-6), 2)
+
+    def stats(self):
+        """카메라별 할당 fps / 실제 fps / 우선순위 (API 응답 및 shm 발행용)"""
+        now = time.time()
+        with self._lock:
+            cameras = [{
+                "key": p.key,
+                "allocated_fps": round(p.allocated, 2),
+                "achieved_fps": self._achieved(p, now),
+                "priority": round(p.priority, 3),
+                "count": p.count,
+                "level": round(p.level, 2),
+                "volatility": round(p.volatility, 2),
+                "staleness": round(now - p.last_result, 2),
+            } for p in self._parts.values()]
+        return {"total_fps": self.total_fps, "min_fps": self.min_fps, "max_fps": self.max_fps,
+                "achieved_fps": round(sum(c["achieved_fps"] for c in cameras), 2),
+                "cameras": cameras, "updated_at": now}
@@ -0,0 +1,220 @@
+import os
+import random
+import threading
+import time
+from collections import deque
+
+# 실시간 스트림으로 볼 소스 (rtsp://, http(s)://, 카메라 번호). 그 외(파일)는 기존처럼 처음부터 순서대로 읽음
+LIVE_PREFIXES = ("rtsp://", "rtsps://", "http://", "https://", "udp://", "tcp://")
+RECONNECT_MIN = float(os.getenv("BEREADY_RECONNECT_MIN", "1"))  # 재연결 대기 시작값(초)
+RECONNECT_MAX = float(os.getenv("BEREADY_RECONNECT_MAX", "30"))  # 재연결 대기 최대값(초)
+READ_TIMEOUT = float(os.getenv("BEREADY_READ_TIMEOUT", "5"))  # 이 시간 동안 새 프레임이 없으면 끊긴 것으로 봄(초)
+
+_captures = {}  # key -> 열린 캡처 (통계 조회용)
+
+
+def is_live(source) -> bool:
+    return isinstance(source, int) or str(source).isdigit() or str(source).lower().startswith(LIVE_PREFIXES)
+
+
+def _open_cv(source):
+    import cv2  # 추론 역할에서만 필요
+
+    if str(source).isdigit():
+        cap = cv2.VideoCapture(int(source))
+    elif is_live(source) and hasattr(cv2, "CAP_PROP_READ_TIMEOUT_MSEC"):
+        # 스트림이 멈추면 grab()이 무한정 막히지 않고 READ_TIMEOUT 후 실패 → 재연결로 넘어감 (OpenCV 4.6+)
+        ms = int(READ_TIMEOUT * 1000)
+        cap = cv2.VideoCapture(source, cv2.CAP_FFMPEG,
+                               [cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, ms, cv2.CAP_PROP_READ_TIMEOUT_MSEC, ms])
+    else:
+        cap = cv2.VideoCapture(source)
+    if is_live(source):
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # 지원하는 백엔드에서는 내부 버퍼 자체를 줄임
+    return cap
+
+
+class _LatencyStats:
+    """프레임 수신 → 추론 결과까지 걸린 시간(초) 최근 window개"""
+
+    def __init__(self, window=200):
+        self.samples = deque(maxlen=window)
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+
+    def summary(self):
+        data = sorted(self.samples)
+        if not data:
+            return {"p50_ms": None, "p95_ms": None, "max_ms": None}
+        pick = lambda q: round(data[min(len(data) - 1, int(q * len(data)))] * 1000, 1)
+        return {"p50_ms": pick(0.5), "p95_ms": pick(0.95), "max_ms": round(data[-1] * 1000, 1)}
+
+
+class FileCapture:
+    """동영상 파일: 기존 동작 그대로 프레임을 하나도 건너뛰지 않고 순서대로 읽음, 끝나면 ended"""
+    live = False
+
+    def __init__(self, source, key=None, opener=_open_cv):
+        self.source = source
+        self.key = key if key is not None else source
+        self.ended = False
+        self.frames = 0
+        self.latency = _LatencyStats()
+        self._cap = opener(source)
+
+    def opened(self) -> bool:
+        return self._cap.isOpened()
+
+    def read(self, timeout=None):
+        """(frame, 수신 시각). 파일이 끝나면 (None, None)이고 ended=True"""
+        ok, frame = self._cap.read()
+        if not ok:
+            self.ended = True
+            return None, None
+        self.frames += 1
+        return frame, time.time()
+
+    def record_result(self, captured_at, ts=None):
+        self.latency.add((ts or time.time()) - captured_at)
+
+    def stats(self):
+        return {"key": self.key, "source": str(self.source), "live": False, "frames": self.frames,
+                "ended": self.ended, "latency": self.latency.summary()}
+
+    def release(self):
+        self._cap.release()
+        _captures.pop(self.key, None)
+
+
+class LiveCapture:
+    """
+    실시간 스트림용 캡처. 전용 스레드가 grab()만 계속 돌려 백엔드 버퍼를 비우고(디코딩 안 함),
+    read()가 프레임을 요청해 두면 그 다음 grab() 직후에 retrieve() 한 번으로 그 프레임만 디코딩해서 넘겨줌.
+    → 버리는 프레임은 디코딩/색변환 비용이 없고, read()는 VideoCapture를 직접 건드리지 않으므로
+      grab()이 막혀 있어도(느린/멈춘 스트림) 락에 걸리지 않음. 추론이 느려도 항상 최신 프레임.
+    - grab 실패(스트림 종료, READ_TIMEOUT 초과 포함)면 닫고 지수 백오프(+지터)로 재연결 (스레드는 그대로)
+    - record_result()로 프레임 수신 → 결과 발행까지의 지연을 기록
+    """
+    live = True
+    ended = False
+
+    def __init__(self, source, key=None, opener=_open_cv, reconnect_min=RECONNECT_MIN,
+                 reconnect_max=RECONNECT_MAX, stall_timeout=READ_TIMEOUT):
+        self.source = source
+        self.key = key if key is not None else source
+        self.opener = opener
+        self.reconnect_min = reconnect_min
+        self.reconnect_max = reconnect_max
+        self.stall_timeout = stall_timeout
+        self.latency = _LatencyStats()
+        self.grabbed = 0  # 받은 프레임 수
+        self.used = 0  # read()가 실제로 넘긴(= 디코딩한) 프레임 수 (나머지는 grab만 하고 버림)
+        self.reconnects = 0
+        self.connected = False
+        self.last_error = None
+        self._cap = None  # 캡처 스레드만 사용
+        self._want = False  # read()가 프레임을 기다리는 중 → 다음 grab 후 retrieve
+        self._frame = None  # (frame, 수신 시각) read() 요청에 맞춰 디코딩한 프레임
+        self._cond = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def opened(self) -> bool:
+        return self._running
+
+    def _connect(self):
+        cap = self.opener(self.source)
+        if not cap.isOpened():
+            cap.release()
+            raise ConnectionError(f"cannot open {self.source}")
+        self._cap = cap
+        self.connected = True
+
+    def _disconnect(self):
+        self.connected = False
+        cap, self._cap = self._cap, None
+        if cap is not None:
+            cap.release()
+
+    def _run(self):
+        delay = self.reconnect_min
+        while self._running:
+            try:
+                self._connect()
+                print(f"[INFO] Stream connected: {self.source}")
+                delay = self.reconnect_min
+                self._grab_loop()
+                self.last_error = "stream ended or stalled"
+            except Exception as e:
+                self.last_error = str(e)
+            self._disconnect()
+            if not self._running:
+                break
+            self.reconnects += 1
+            wait = delay * random.uniform(0.8, 1.2)
+            print(f"[WARN] Stream lost ({self.last_error}): {self.source}, reconnect in {wait:.1f}s")
+            time.sleep(wait)
+            delay = min(delay * 2, self.reconnect_max)
+
+    def _grab_loop(self):
+        while self._running:
+            if not self._cap.grab():
+                return
+            grabbed_at = time.time()
+            self.grabbed += 1
+            if not self._want:
+                continue  # 아무도 안 기다리면 디코딩 없이 버림
+            ok, frame = self._cap.retrieve()
+            if not ok:
+                return
+            with self._cond:
+                self._frame = (frame, grabbed_at)
+                self._want = False
+                self._cond.notify_all()
+
+    def read(self, timeout=None):
+        """
+        호출한 뒤 처음 grab된 프레임 (frame, 수신 시각). 최대 한 프레임 간격만큼 기다림.
+        timeout(기본 stall_timeout) 안에 새 프레임이 없으면 (None, None) → 호출하는 쪽은 다시 시도하면 됨
+        """
+        timeout = self.stall_timeout if timeout is None else timeout
+        with self._cond:
+            self._frame = None  # 이전 요청이 시간 초과된 뒤 늦게 디코딩된 프레임은 버림
+            self._want = True
+            if not self._cond.wait_for(lambda: self._frame is not None or not self._running, timeout) \
+                    or not self._running:
+                return None, None
+            frame, grabbed_at = self._frame
+            self._frame = None
+        self.used += 1
+        return frame, grabbed_at
+
+    def record_result(self, captured_at, ts=None):
+        self.latency.add((ts or time.time()) - captured_at)
+
+    def stats(self):
+        return {"key": self.key, "source": str(self.source), "live": True, "connected": self.connected,
+                "grabbed": self.grabbed, "used": self.used, "skipped": max(self.grabbed - self.used, 0),
+                "reconnects": self.reconnects, "last_error": self.last_error,
+                "latency": self.latency.summary()}
+
+    def release(self):
+        """캡처 스레드를 멈춤. VideoCapture는 캡처 스레드가 grab에서 빠져나오면서 직접 닫음"""
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        self._thread.join(timeout=2)
+        _captures.pop(self.key, None)
+
+
+def open_capture(source, key=None):
+    """소스 종류에 맞는 캡처(스트림: LiveCapture, 파일: FileCapture)를 열고 통계 조회용으로 등록"""
+    cap = LiveCapture(source, key) if is_live(source) else FileCapture(source, key)
+    _captures[cap.key] = cap
+    return cap
+
+
+def capture_stats():
+    return [c.stats() for c in list(_captures.values())]
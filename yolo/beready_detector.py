@@ -0,0 +1,106 @@
+import os
+import threading
+import time
+import warnings
+
+import cv2
+from ultralytics import YOLO
+
+from yolo.beready_capture import is_live, open_capture
+
+warnings.filterwarnings("ignore", category=FutureWarning)
+
+PERSON_CLASS_ID = 0  # YOLOv8 모델에서 ID: 0번이 사람
+MODEL_PATH = os.getenv("BEREADY_MODEL_PATH", "yolov8n.pt")
+
+# 추론 역할(BEREADY_ROLE=all|inference)에서만 import되는 모듈 → API 워커는 ultralytics/torch를 로드하지 않음
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_model():
+    """YOLOv8 모델은 프로세스당 한 번만 로드 (카메라 스레드들이 공유)"""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = YOLO(MODEL_PATH)
+    return _model
+
+
+def detect_people(camera_index, video_path, publisher, budget=None):  # 사람 탐지 함수
+    """
+    budget(InferenceBudget)이 있으면 할당받은 fps에 맞춰 추론하고, 없으면 기존처럼 최대한 빨리 + 50ms 휴식.
+    video_path가 스트림 URL이면 항상 최신 프레임만 보고 끊기면 알아서 재연결 (beready_capture.LiveCapture)
+    """
+    if not is_live(video_path) and not os.path.exists(video_path):
+        print(f"[WARN] Video not found: {video_path}")
+        return
+
+    cap = open_capture(video_path, key=camera_index)  # 파일이면 순서대로, 스트림이면 최신 프레임만
+
+    if not cap.opened():
+        print(f"[ERROR] Cannot open video: {video_path}")
+        cap.release()
+        return
+
+    model = get_model()
+    print(f"[INFO] Started detecting on {video_path}")
+    if budget is not None:
+        budget.register(camera_index)
+
+    try:
+        _detect_loop(camera_index, cap, model, publisher, budget)
+    finally:
+        if budget is not None:
+            budget.unregister(camera_index)  # 남는 몫은 다른 카메라에게
+        cap.release()  # cap 객체가 사용하던 영상 스트림을 종료
+        #cv2.destroyAllWindows()  # OpenCV가 생성한 모든 창(윈도우)을 닫음
+
+
+def _detect_loop(camera_index, cap, model, publisher, budget):
+    while True:  # 무한 루프 시작
+        if budget is not None:
+            budget.acquire(camera_index)  # 이 카메라 차례까지 대기
+        frame, captured_at = cap.read()  # 파일: 다음 프레임 / 스트림: 아직 안 본 가장 최신 프레임
+        if frame is None:
+            if cap.ended:  # 파일 끝이면 루프 종료
+                break
+            continue  # 스트림 재연결 중 → 다시 대기
+
+        frame = cv2.resize(frame, (640, 360))  # YOLO 처리 속도 향상을 위해 프레임을 640x360으로 리사이즈
+        results = model(frame, conf=0.2, iou=0.5, max_det=20, verbose=False)[0]  # 프레임을 YOLO 모델에 입력하고, 첫 번째 결과 ([0])를 가져옴
+        # 하이퍼파라미터 #conf(기본 0.25, 낮추면 더 많이 탐지하지만 오탐 증가) # iou(기본 0.7, 낮추면 중복 제거 강하게 적용됨) # max_det(한 프레임에서 최대 탐지 수)
+        person_detections = [box for box in results.boxes if int(box.cls[0]) == PERSON_CLASS_ID]
+
+        now = time.time()
+        snap = publisher.publish_count(camera_index, len(person_detections), now)  # 사람 수 발행
+        cap.record_result(captured_at, now)  # 프레임 수신 → 결과 발행 지연
+        if budget is not None:
+            budget.report(camera_index, len(person_detections), now)
+        current_wait_time = snap.wait_time  # 임시로 예상대기시간도 표시하기위해 추가
+
+        """
+        # 디스플레이 (카메라별 개별 창)
+        for box in person_detections:  # 박스 그리기
+            x1, y1, x2, y2 = map(int, box.xyxy[0])  # 경계 상자 좌표
+            conf = float(box.conf[0])  # 신뢰도(확률)
+            cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)  # 프레임에 초록색 박스를 그림
+            cv2.putText(frame, f'Person {conf:.2f}', (x1, y1 - 10),  # 프레임에 라벨을 그림
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+
+
+        cv2.putText(frame, f'Cam{camera_index + 1}: {snap.counts[camera_index]} | Total: {snap.total}', (10, 30),
+                    # 현재 감지된 사람 수를 좌상단에 표시
+                    cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+        # 예상 대기 시간 표시
+        cv2.putText(frame, f'Wait Time: {current_wait_time} min', (10, 70),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2)
+
+        cv2.imshow(f'Camera {camera_index + 1}', frame)  # 프레임을 실시간으로 화면에 표시
+        if cv2.waitKey(1) & 0xFF == 27:  # 사용자가 ESC키를 누르면 루프 종료
+            break
+        """
+
+        if budget is None:
+            time.sleep(0.05)  # CPU 점유율 완화
@@ -0,0 +1,100 @@
+import math
+from collections import deque
+
+
+class DwellEstimator:
+    """
+    사람 1명당 처리 시간(초) 추정기.
+    모든 트랙의 (체류시간 / 입장 시점 인원수) 샘플을 최근 window개만 모아 절사평균(trimmed mean)을 낸다.
+    add()는 추적 스레드에서, value()는 API/대기시간 스레드에서 호출 → value()는 캐시값만 읽음.
+    """
+
+    def __init__(self, window=200, trim=0.1, min_samples=5, default=20.0):
+        self.samples = deque(maxlen=window)
+        self.trim = trim  # 양쪽에서 잘라낼 비율 (0.1이면 위아래 10%씩)
+        self.min_samples = min_samples
+        self.default = default
+        self.total = 0  # 지금까지 받은 샘플 수
+        self._value = default
+
+    def add(self, seconds_per_person):
+        self.samples.append(seconds_per_person)
+        self.total += 1
+        self._recompute()
+
+    def _recompute(self):
+        if len(self.samples) < self.min_samples:
+            return
+        data = sorted(self.samples)
+        k = int(len(data) * self.trim)
+        kept = data[k:len(data) - k] or data
+        self._value = sum(kept) / len(kept)
+
+    def value(self):
+        return self._value
+
+    # 스냅샷 저장/복원용
+    def state(self):
+        return {"samples": list(self.samples), "total": self.total, "value": self._value}
+
+    def load(self, state):
+        self.samples.clear()
+        self.samples.extend(state["samples"])
+        self.total = state["total"]
+        self._value = state["value"]
+
+
+class WaitEstimator:
+    """
+    카메라가 인원수를 낼 때마다 O(1)로 갱신되는 예상 대기시간 추정기.
+    - 대기열 길이: 전체 인원 - offset 을 시간 기반 EWMA(시정수 window초)로 평균/분산 추적
+    - 1인당 처리시간: service() (기본은 DwellEstimator 값, 초)
+    - 예상 대기(분) = 대기열 평균 * 처리시간 / 60, 구간은 대기열 EWMA 표준편차로 계산
+    observe()는 호출하는 쪽에서 직렬화(락)해야 하고, estimate()는 계산해 둔 결과만 읽는다.
+    """
+
+    def __init__(self, cameras, service, window=60.0, offset=3, z=1.96):
+        self.counts = [0] * cameras
+        self.total = 0
+        self.service = service
+        self.window = window  # EWMA 시정수(초): 클수록 부드럽고 느리게 반응
+        self.offset = offset  # 대기열이 아닌 인원(배식/계산 중인 사람 등)
+        self.z = z  # 1.96이면 95% 구간
+        self.mean = None
+        self.var = 0.0
+        self.last_ts = None
+        self._estimate = {"wait_time": 0, "wait_minutes": 0.0, "wait_low": 0.0, "wait_high": 0.0,
+                          "updated_at": None}
+
+    def queue_length(self, total):
+        # 기존 calculate_wait_time과 동일: offset명 이상일 때만 offset을 뺌
+        return total - self.offset if total >= self.offset else total
+
+    def observe(self, camera_index, count, ts):
+        self.total += count - self.counts[camera_index]
+        self.counts[camera_index] = count
+        x = self.queue_length(self.total)
+
+        if self.mean is None:
+            self.mean = float(x)
+        else:
+            dt = max(ts - self.last_ts, 0.0)
+            alpha = 1.0 - math.exp(-dt / self.window)
+            diff = x - self.mean
+            self.mean += alpha * diff
+            self.var = (1.0 - alpha) * (self.var + alpha * diff * diff)
+        self.last_ts = ts
+
+        per_person = self.service() / 60  # 분
+        half = self.z * math.sqrt(self.var) * per_person
+        minutes = self.mean * per_person
+        self._estimate = {
+            "wait_time": round(minutes),
+            "wait_minutes": round(minutes, 2),
+            "wait_low": round(max(minutes - half, 0.0), 2),
+            "wait_high": round(minutes + half, 2),
+            "updated_at": ts,
+        }
+
+    def estimate(self):
+        return self._estimate
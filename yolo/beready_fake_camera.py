@@ -0,0 +1,108 @@
+"""
+로컬 대역 카메라: 샘플 mp4를 실시간 속도의 MJPEG over HTTP 스트림으로 내보냄 (LiveCapture 테스트용)
+
+    python -m yolo.beready_fake_camera people.mp4 "theme park.mp4" --port 8090
+    → http://127.0.0.1:8090/cam/0 , http://127.0.0.1:8090/cam/1
+
+    BEREADY_VIDEO_PATHS="http://127.0.0.1:8090/cam/0,http://127.0.0.1:8090/cam/1" uvicorn main:app
+
+--drop-every N 이면 N초마다 연결을 끊어서 재연결(백오프) 동작을 확인할 수 있음.
+영상 끝에 도달하면 처음부터 다시 재생. 각 연결은 접속한 시점의 "현재" 프레임부터 받음 (실제 카메라처럼).
+"""
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+
+BOUNDARY = "frame"
+
+
+class _Feed:
+    """파일 하나를 원래 fps로 재생하면서 최신 JPEG만 들고 있음 (접속자 수와 무관하게 디코딩은 한 번)"""
+
+    def __init__(self, path, quality=80):
+        self.path = path
+        self.quality = quality
+        self.jpeg = None
+        self.seq = 0
+        self._cond = threading.Condition()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        cap = cv2.VideoCapture(self.path)
+        if not cap.isOpened():
+            print(f"[ERROR] Cannot open video: {self.path}")
+            return
+        interval = 1.0 / (cap.get(cv2.CAP_PROP_FPS) or 25.0)
+        next_at = time.time()
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, 0)  # 반복 재생
+                continue
+            ok, buf = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+            if ok:
+                with self._cond:
+                    self.jpeg = buf.tobytes()
+                    self.seq += 1
+                    self._cond.notify_all()
+            next_at += interval
+            time.sleep(max(0.0, next_at - time.time()))
+
+    def wait_next(self, after, timeout=5.0):
+        with self._cond:
+            self._cond.wait_for(lambda: self.seq > after, timeout)
+            return self.seq, self.jpeg
+
+
+def make_handler(feeds, drop_every):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parts = self.path.strip("/").split("/")
+            if len(parts) != 2 or parts[0] != "cam" or not parts[1].isdigit() or int(parts[1]) >= len(feeds):
+                self.send_error(404)
+                return
+            feed = feeds[int(parts[1])]
+            self.send_response(200)
+            self.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            started, seq = time.time(), 0
+            try:
+                while not drop_every or time.time() - started < drop_every:
+                    seq, jpeg = feed.wait_next(seq)
+                    if jpeg is None:
+                        continue
+                    self.wfile.write(f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\n"
+                                     f"Content-Length: {len(jpeg)}\r\n\r\n".encode())
+                    self.wfile.write(jpeg)
+                    self.wfile.write(b"\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, fmt, *args):
+            print(f"[INFO] fake camera {self.address_string()} {fmt % args}")
+
+    return Handler
+
+
+def main():
+    ap = argparse.ArgumentParser(description="serve sample videos as live MJPEG streams")
+    ap.add_argument("videos", nargs="+")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8090)
+    ap.add_argument("--drop-every", type=float, default=0, help="close each connection after N seconds")
+    args = ap.parse_args()
+
+    feeds = [_Feed(path) for path in args.videos]
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(feeds, args.drop_every))
+    server.daemon_threads = True
+    for i, path in enumerate(args.videos):
+        print(f"[INFO] {path} → http://{args.host}:{args.port}/cam/{i}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
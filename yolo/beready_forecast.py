@@ -0,0 +1,93 @@
+import math
+import threading
+import time
+
+from yolo.beready_history import TZ_OFFSET, bucket_of
+
+SLOT = 300  # 5분 슬롯 (history의 5분 집계와 같은 단위)
+SLOTS_PER_DAY = 86400 // SLOT
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def slot_of(ts):
+    """unix time → (KST 요일 0=월, 그날의 5분 슬롯 번호)"""
+    local = ts + TZ_OFFSET
+    return int((local // 86400 + 3) % 7), int(local % 86400 // SLOT)  # 1970-01-01은 목요일(3)
+
+
+def parse_hhmm(text):
+    """'12:10' → 분 단위(730). 형식이 틀리면 ValueError"""
+    h, m = text.split(":")
+    h, m = int(h), int(m)
+    if not (0 <= h < 24 and 0 <= m < 60):
+        raise ValueError(f"invalid time: {text}")
+    return h * 60 + m
+
+
+class WaitForecast:
+    """
+    요일 x 5분 슬롯별 예상 대기시간 표 (메모리).
+    history의 5분 집계 한 칸(평균 대기시간)을 해당 슬롯의 표본 하나로 누적한다.
+    refresh()는 마지막으로 반영한 버킷 이후의 '완료되고 기록까지 끝난' 버킷만 읽어 더하므로 증분 갱신,
+    lookup()은 표에서 한 칸을 꺼내기만 한다.
+    """
+
+    def __init__(self, history, refresh_interval=300.0):
+        self.history = history
+        self.refresh_interval = refresh_interval
+        # 각 칸은 (n, 합, 제곱합) 튜플 → 통째로 교체하므로 읽는 쪽이 반쯤 갱신된 값을 보지 않음
+        self.table = [[(0, 0.0, 0.0)] * SLOTS_PER_DAY for _ in range(7)]
+        self._loaded_until = -1  # 여기까지의 버킷은 이미 반영됨
+        self._lock = threading.Lock()  # refresh끼리만 직렬화
+        self._started = False
+
+    def settle_seconds(self):
+        """버킷이 끝난 뒤 history가 마지막 표본까지 기록할 때까지 기다릴 시간 (flush_every개씩 모아 쓰므로)"""
+        return 2 * self.history.flush_every * self.history.sample_interval
+
+    def refresh(self):
+        with self._lock:
+            # 아직 쌓이는 중인 버킷 + 끝났어도 마지막 묶음이 아직 기록되지 않았을 수 있는 버킷은 제외
+            # (_loaded_until을 넘긴 버킷은 다시 읽지 않으므로 반쯤 찬 채로 반영되면 안 됨)
+            cutoff = bucket_of(time.time() - self.settle_seconds(), SLOT)
+            rows = self.history.buckets_since(SLOT, self._loaded_until, cutoff)
+            for bucket, n, sum_wait in rows:
+                if not n:
+                    continue
+                avg = sum_wait / n
+                wd, idx = slot_of(bucket)
+                cnt, s, sq = self.table[wd][idx]
+                self.table[wd][idx] = (cnt + 1, s + avg, sq + avg * avg)
+            if rows:
+                self._loaded_until = rows[-1][0]
+            return len(rows)
+
+    def start(self):
+        if self._started:
+            return
+        self._started = True
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"[WARN] Forecast refresh failed: {e}")
+            time.sleep(self.refresh_interval)
+
+    def lookup(self, weekday, minute_of_day):
+        idx = minute_of_day * 60 // SLOT
+        n, s, sq = self.table[weekday][idx]
+        start = idx * SLOT // 60
+        out = {"weekday": weekday, "weekday_name": WEEKDAYS[weekday], "slot": f"{start // 60:02d}:{start % 60:02d}", "samples": n,
+               "expected_wait": None, "stddev": None}
+        if n:
+            mean = s / n
+            out["expected_wait"] = round(mean, 2)
+            out["stddev"] = round(math.sqrt(max(sq / n - mean * mean, 0.0)), 2)
+        return out
+
+    def day(self, weekday):
+        """해당 요일에서 데이터가 있는 슬롯만"""
+        return [self.lookup(weekday, i * SLOT // 60) for i in range(SLOTS_PER_DAY) if self.table[weekday][i][0]]
@@ -0,0 +1,191 @@
+import sqlite3
+import threading
+import time
+
+TZ_OFFSET = 9 * 3600  # KST(UTC+9, 서머타임 없음) → 하루 단위 집계를 한국 자정 기준으로 맞춤
+
+# 집계 해상도(초) → 보존 기간(초), None이면 무기한
+ROLLUPS = {
+    60: 30 * 86400,  # 1분 단위: 30일
+    300: 2 * 365 * 86400,  # 5분 단위: 2년 (요일 x 5분 슬롯 예측에 사용)
+    900: 2 * 365 * 86400,  # 15분 단위: 2년
+    86400: None,  # 1일 단위: 계속 보관
+}
+RAW_RETENTION = 3 * 86400  # 원본(1초 간격) 보존 기간
+TOTAL = -1  # camera 컬럼에서 전체 합계를 뜻하는 값
+
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS estimation_raw(
+  ts REAL NOT NULL,
+  camera INTEGER NOT NULL,
+  count INTEGER NOT NULL,
+  wait REAL NOT NULL,
+  PRIMARY KEY(camera, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS estimation_rollup(
+  res INTEGER NOT NULL,
+  bucket INTEGER NOT NULL,
+  camera INTEGER NOT NULL,
+  n INTEGER NOT NULL,
+  sum_count REAL NOT NULL,
+  min_count INTEGER NOT NULL,
+  max_count INTEGER NOT NULL,
+  sum_wait REAL NOT NULL,
+  max_wait REAL NOT NULL,
+  PRIMARY KEY(res, camera, bucket)
+) WITHOUT ROWID;
+"""
+
+UPSERT_ROLLUP_SQL = """
+INSERT INTO estimation_rollup(res, bucket, camera, n, sum_count, min_count, max_count, sum_wait, max_wait)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(res, camera, bucket) DO UPDATE SET
+  n = n + excluded.n,
+  sum_count = sum_count + excluded.sum_count,
+  min_count = MIN(min_count, excluded.min_count),
+  max_count = MAX(max_count, excluded.max_count),
+  sum_wait = sum_wait + excluded.sum_wait,
+  max_wait = MAX(max_wait, excluded.max_wait)
+"""
+
+
+def bucket_of(ts, res):
+    return int((ts + TZ_OFFSET) // res * res - TZ_OFFSET)
+
+
+def pick_resolution(start, end, max_points=1500):
+    """구간 길이에 맞춰 점 개수가 max_points 이하가 되는 가장 촘촘한 집계 해상도"""
+    now = time.time()
+    for res in sorted(ROLLUPS):
+        keep = ROLLUPS[res]
+        if keep is not None and start < now - keep:
+            continue  # 이미 지워졌을 구간
+        if (end - start) / res <= max_points:
+            return res
+    return max(ROLLUPS)
+
+
+class HistoryStore:
+    """
+    카메라별 인원수와 예상 대기시간 시계열 (SQLite).
+    start()하면 백그라운드 스레드가 sample_interval초마다 source.current()를 읽어 버퍼에 쌓고,
+    flush_every개마다 원본 + 1분/5분/15분/1일 집계를 한 트랜잭션으로 기록한다.
+    조회는 항상 집계 테이블에서 (res, camera, bucket) 기본키 범위 스캔으로 처리.
+    """
+
+    def __init__(self, path, sample_interval=1.0, flush_every=10, stale_after=30.0):
+        self.path = path
+        self.sample_interval = sample_interval
+        self.flush_every = flush_every
+        self.stale_after = stale_after  # 카메라가 멈춰 이보다 오래된 스냅샷은 기록하지 않음
+        self._local = threading.local()
+        self._started = False
+        self._last_prune = 0.0
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=3.0)
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("PRAGMA synchronous=NORMAL;")
+        return conn
+
+    def _reader(self):
+        # 스레드별로 연결 하나씩 재사용
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            conn.executescript(SCHEMA_SQL)
+            self._local.conn = conn
+        return conn
+
+    # ---------------- 쓰기 ----------------
+    def start(self, source):
+        if self._started:
+            return
+        self._started = True
+        threading.Thread(target=self._run, args=(source,), daemon=True).start()
+
+    def _run(self, source):
+        conn = self._connect()
+        conn.executescript(SCHEMA_SQL)
+        buf = []
+        last_ts = None
+        while True:
+            time.sleep(self.sample_interval)
+            snap = source.current()
+            now = time.time()
+            if snap.updated_at is None or now - snap.updated_at > self.stale_after:
+                continue
+            if snap.updated_at == last_ts:  # 새 관측이 없으면 같은 값을 중복 기록하지 않음
+                continue
+            last_ts = snap.updated_at
+            buf.append((now, snap.counts, snap.total, snap.wait_minutes))
+            if len(buf) >= self.flush_every:
+                try:
+                    self.write(conn, buf)
+                    self._maybe_prune(conn, now)
+                except sqlite3.Error as e:
+                    print(f"[WARN] History write failed: {e}")
+                buf = []
+
+    def write(self, conn, samples):
+        """samples: [(ts, counts, total, wait_minutes), ...]"""
+        raw = []
+        agg = {}
+        for ts, counts, total, wait in samples:
+            for cam, c in list(enumerate(counts)) + [(TOTAL, total)]:
+                raw.append((ts, cam, c, wait))
+                for res in ROLLUPS:
+                    key = (res, bucket_of(ts, res), cam)
+                    a = agg.get(key)
+                    if a is None:
+                        agg[key] = [1, c, c, c, wait, wait]
+                    else:
+                        a[0] += 1
+                        a[1] += c
+                        a[2] = min(a[2], c)
+                        a[3] = max(a[3], c)
+                        a[4] += wait
+                        a[5] = max(a[5], wait)
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO estimation_raw(ts, camera, count, wait) VALUES (?, ?, ?, ?)", raw)
+            conn.executemany(UPSERT_ROLLUP_SQL, [key + tuple(a) for key, a in agg.items()])
+
+    def _maybe_prune(self, conn, now, every=3600):
+        if now - self._last_prune < every:
+            return
+        self._last_prune = now
+        with conn:
+            conn.execute("DELETE FROM estimation_raw WHERE ts < ?", (now - RAW_RETENTION,))
+            for res, keep in ROLLUPS.items():
+                if keep is not None:
+                    conn.execute("DELETE FROM estimation_rollup WHERE res = ? AND bucket < ?", (res, now - keep))
+
+    # ---------------- 읽기 ----------------
+    def buckets_since(self, res, after, before, camera=TOTAL):
+        """after < bucket < before 인 집계 행 [(bucket, n, sum_wait), ...] (예측 테이블 증분 갱신용)"""
+        return self._reader().execute(
+            "SELECT bucket, n, sum_wait FROM estimation_rollup "
+            "WHERE res = ? AND camera = ? AND bucket > ? AND bucket < ? ORDER BY bucket",
+            (res, camera, after, before),
+        ).fetchall()
+
+    def query(self, start, end, resolution=None, camera=TOTAL):
+        if start >= end:
+            raise ValueError("start must be before end")
+        res = resolution or pick_resolution(start, end)
+        if res not in ROLLUPS:
+            raise ValueError(f"resolution must be one of {sorted(ROLLUPS)}")
+        rows = self._reader().execute(
+            "SELECT bucket, n, sum_count, min_count, max_count, sum_wait, max_wait FROM estimation_rollup "
+            "WHERE res = ? AND camera = ? AND bucket >= ? AND bucket < ? ORDER BY bucket",
+            (res, camera, bucket_of(start, res), end),
+        ).fetchall()
+        return {
+            "resolution": res,
+            "camera": camera,
+            "points": [
+                {"t": b, "samples": n, "avg_count": round(sc / n, 2), "min_count": mn, "max_count": mx,
+                 "avg_wait": round(sw / n, 2), "max_wait": round(mw, 2)}
+                for b, n, sc, mn, mx, sw, mw in rows
+            ],
+        }
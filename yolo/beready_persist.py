@@ -0,0 +1,124 @@
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from tracker.basetrack import BaseTrack
+from tracker.byte_tracker import STrack
+
+SNAPSHOT_VERSION = 2  # 스냅샷 포맷이 바뀌면 올려서 예전 파일은 무시
+
+
+# ---------------- BYTETracker <-> dict ----------------
+def _dump_track(t):
+    return {
+        "track_id": int(t.track_id),
+        "tlwh": [float(v) for v in t._tlwh],
+        "mean": t.mean.tolist() if t.mean is not None else None,
+        "covariance": t.covariance.tolist() if t.covariance is not None else None,
+        "state": int(t.state),
+        "is_activated": bool(t.is_activated),
+        "score": float(t.score),
+        "tracklet_len": int(t.tracklet_len),
+        "frame_id": int(t.frame_id),
+        "start_frame": int(t.start_frame),
+    }
+
+
+def _load_track(d, kalman_filter):
+    t = STrack(np.asarray(d["tlwh"], dtype=np.float32), d["score"])
+    t.kalman_filter = kalman_filter
+    t.track_id = d["track_id"]
+    if d["mean"] is not None:
+        t.mean = np.asarray(d["mean"], dtype=np.float64)
+        t.covariance = np.asarray(d["covariance"], dtype=np.float64)
+    t.state = d["state"]
+    t.is_activated = d["is_activated"]
+    t.tracklet_len = d["tracklet_len"]
+    t.frame_id = d["frame_id"]
+    t.start_frame = d["start_frame"]
+    return t
+
+
+def dump_tracker(tracker):
+    """BYTETracker 상태를 JSON으로 저장 가능한 dict로 변환 (removed 트랙은 제외)"""
+    return {
+        "frame_id": int(tracker.frame_id),
+        "next_id": int(BaseTrack._count),
+        "tracked": [_dump_track(t) for t in tracker.tracked_stracks],
+        "lost": [_dump_track(t) for t in tracker.lost_stracks],
+    }
+
+
+def load_tracker(tracker, data):
+    """dump_tracker()로 만든 dict를 기존 BYTETracker 객체에 복원"""
+    tracker.frame_id = data["frame_id"]
+    tracker.tracked_stracks = [_load_track(d, tracker.kalman_filter) for d in data["tracked"]]
+    tracker.lost_stracks = [_load_track(d, tracker.kalman_filter) for d in data["lost"]]
+    tracker.removed_stracks = []
+    # 새 ID가 복원된 ID와 겹치지 않도록 카운터를 앞으로 당김
+    BaseTrack._count = max(BaseTrack._count, data["next_id"])
+
+
+# ---------------- 디스크 입출력 ----------------
+def write_snapshot(path, state):
+    """임시 파일에 쓰고 os.replace로 교체 → 중간에 죽어도 반쯤 쓰인 파일이 남지 않음"""
+    payload = dict(state, version=SNAPSHOT_VERSION, saved_at=time.time())
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def read_snapshot(path, max_age):
+    """max_age초 이내에 저장된 스냅샷이면 dict, 아니면 None"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f"[WARN] Snapshot unreadable, ignored: {e}")
+        return None
+
+    if data.get("version") != SNAPSHOT_VERSION:
+        print("[WARN] Snapshot version mismatch, ignored.")
+        return None
+    age = time.time() - data.get("saved_at", 0)
+    if age > max_age:
+        print(f"[INFO] Snapshot too old ({age:.0f}s), starting fresh.")
+        return None
+    return data
+
+
+class SnapshotWriter:
+    """
+    추적 루프는 submit()으로 dict만 넘기고 바로 돌아감.
+    직렬화/fsync는 별도 스레드에서 처리하고, 밀린 요청은 가장 최신 것만 남김.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._pending = None
+        self._cond = threading.Condition()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, state):
+        with self._cond:
+            self._pending = state
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                state, self._pending = self._pending, None
+            try:
+                write_snapshot(self.path, state)
+            except OSError as e:
+                print(f"[WARN] Snapshot write failed: {e}")
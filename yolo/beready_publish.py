@@ -0,0 +1,64 @@
+import threading
+from typing import NamedTuple, Optional, Tuple
+
+
+class EstimateSnapshot(NamedTuple):
+    """감지 스레드가 발행하는 불변 스냅샷. 필드를 바꾸지 말고 새로 만들어서 교체한다."""
+    version: int  # 내용(인원수/대기시간)이 바뀔 때만 1씩 증가
+    counts: Tuple[int, ...]  # 카메라별 인원수
+    total: int
+    wait_time: int
+    wait_minutes: float
+    wait_low: float
+    wait_high: float
+    service_seconds: float  # 1인당 처리시간(초), /wait 값
+    updated_at: Optional[float]  # 마지막 관측 시각 (내용이 같아도 갱신)
+
+    def to_response(self):
+        """EstimateResponse 형태의 dict (카메라 수와 무관하게 cams 전체, cam1/cam2는 기존 클라이언트용으로 없으면 0)"""
+        counts = self.counts
+        return {"cams": list(counts), "cam1": counts[0] if counts else 0,
+                "cam2": counts[1] if len(counts) > 1 else 0, "total": self.total,
+                "wait_time": self.wait_time, "wait_minutes": self.wait_minutes,
+                "wait_low": self.wait_low, "wait_high": self.wait_high,
+                "updated_at": self.updated_at}
+
+
+class SnapshotPublisher:
+    """
+    쓰기 쪽(카메라 스레드들)끼리만 락으로 직렬화하고, 결과는 새 스냅샷 객체로 만들어 참조만 교체한다.
+    읽기 쪽(API 핸들러)은 current()로 참조를 한 번 읽을 뿐이라 락을 잡지 않는다 → 서로 막지 않음.
+    """
+
+    def __init__(self, estimator):
+        self.estimator = estimator
+        self._write_lock = threading.Lock()
+        self._listeners = []
+        est = estimator.estimate()
+        self._current = EstimateSnapshot(0, tuple(estimator.counts), estimator.total,
+                                         service_seconds=estimator.service(), **est)
+
+    def current(self):
+        return self._current
+
+    def subscribe(self, fn):
+        """내용이 바뀐 스냅샷이 발행될 때마다 fn(snapshot)을 호출 (발행 스레드에서 실행됨)"""
+        self._listeners.append(fn)
+
+    def publish_count(self, camera_index, count, ts):
+        with self._write_lock:
+            self.estimator.observe(camera_index, count, ts)
+            est = self.estimator.estimate()
+            prev = self._current
+            counts = tuple(self.estimator.counts)
+            service = self.estimator.service()
+            changed = (counts != prev.counts or est["wait_minutes"] != prev.wait_minutes
+                       or est["wait_low"] != prev.wait_low or est["wait_high"] != prev.wait_high
+                       or service != prev.service_seconds)
+            snap = EstimateSnapshot(prev.version + 1 if changed else prev.version, counts,
+                                    self.estimator.total, service_seconds=service, **est)
+            self._current = snap  # 참조 교체 한 번 → 읽는 쪽은 항상 완성된 스냅샷만 봄
+        if changed:
+            for fn in self._listeners:
+                fn(snap)
+        return snap
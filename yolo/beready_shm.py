@@ -0,0 +1,129 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+
+from yolo.beready_publish import EstimateSnapshot
+
+# 파일 앞 12바이트: [seq u64][길이 u32], 그 뒤 JSON 본문
+HEADER = struct.Struct("<QI")
+SIZE = 64 * 1024
+
+
+class ShmWriter:
+    """
+    추론 프로세스 → API 워커들로 최신 스냅샷을 넘기는 mmap 파일 (seqlock).
+    쓰기: seq를 홀수로 → 본문 기록 → seq를 짝수로. 읽는 쪽은 앞뒤 seq가 같고 짝수일 때만 채택.
+    쓰는 프로세스는 하나만 있어야 함 (프로세스 안의 여러 스레드는 락으로 직렬화).
+    """
+
+    def __init__(self, path, size=SIZE):
+        self.path = path
+        self.size = size
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            os.ftruncate(fd, size)
+            self._mm = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        self._seq = HEADER.unpack_from(self._mm, 0)[0] & ~1  # 재시작해도 seq는 계속 증가
+        self._lock = threading.Lock()
+
+    def write(self, payload: dict):
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        if HEADER.size + len(body) > self.size:
+            raise ValueError(f"payload too large for shm ({len(body)} bytes)")
+        with self._lock:
+            seq = self._seq + 1
+            HEADER.pack_into(self._mm, 0, seq, 0)  # 홀수: 쓰는 중
+            self._mm[HEADER.size:HEADER.size + len(body)] = body
+            HEADER.pack_into(self._mm, 0, seq + 1, len(body))  # 짝수: 완료
+            self._seq = seq + 1
+
+    def publish(self, snap: EstimateSnapshot):
+        self.write(snap._asdict())
+
+
+class ShmReader:
+    """ShmWriter가 쓴 최신 본문을 읽음. seq가 그대로면 디코딩 없이 이전 결과를 돌려줌"""
+
+    def __init__(self, path, retries=100):
+        self.path = path
+        self.retries = retries
+        self._mm = None
+        self._seq = None
+        self._value = None
+
+    def _open(self):
+        if self._mm is None:
+            if not os.path.exists(self.path) or os.path.getsize(self.path) < HEADER.size:
+                return None
+            with open(self.path, "rb") as f:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mm
+
+    def read(self):
+        mm = self._open()
+        if mm is None:
+            return None
+        for _ in range(self.retries):
+            seq, length = HEADER.unpack_from(mm, 0)
+            if seq == self._seq:
+                return self._value
+            if seq == 0 or seq & 1:  # 아직 안 썼거나 쓰는 중
+                time.sleep(0)
+                continue
+            body = mm[HEADER.size:HEADER.size + length]
+            if HEADER.unpack_from(mm, 0)[0] != seq:  # 읽는 동안 바뀜 → 다시
+                continue
+            self._value = json.loads(body)
+            self._seq = seq
+            return self._value
+        return self._value
+
+
+class ShmSnapshotSource:
+    """
+    API 역할 프로세스에서 SnapshotPublisher 대신 쓰는 읽기 전용 소스 (current / subscribe 동일).
+    start()하면 poll_interval마다 mmap을 확인해서 스냅샷 version이 바뀌었을 때 구독자에게 알림.
+    """
+
+    def __init__(self, path, cameras, poll_interval=0.1, default_service=20.0):
+        self.reader = ShmReader(path)
+        self.poll_interval = poll_interval
+        self._listeners = []
+        self._raw = None
+        self._current = EstimateSnapshot(0, (0,) * cameras, 0, 0, 0.0, 0.0, 0.0, default_service, None)
+        self._started = False
+
+    def current(self):
+        data = self.reader.read()
+        if data is not None and data is not self._raw:
+            self._raw = data
+            self._current = EstimateSnapshot(**dict(data, counts=tuple(data["counts"])))
+        return self._current
+
+    def subscribe(self, fn):
+        self._listeners.append(fn)
+
+    def start(self):
+        if self._started:
+            return
+        self._started = True
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        last_version = self.current().version
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                snap = self.current()
+            except Exception as e:
+                print(f"[WARN] shm read failed: {e}")
+                continue
+            if snap.version != last_version:
+                last_version = snap.version
+                for fn in self._listeners:
+                    fn(snap)
@@ -0,0 +1,89 @@
+import asyncio
+import json
+
+
+class Broadcaster:
+    """
+    /api/lilac/estimation/stream 용 SSE 팬아웃.
+    - 발행 스냅샷의 version이 바뀌면 pump 태스크 하나가 메시지를 한 번만 인코딩해서 모든 구독자 큐에 넣음
+    - min_interval 안에 여러 번 바뀌면 마지막 값만 보냄(합치기)
+    - 아무 변화가 없으면 heartbeat초마다 주석 줄(': ping')을 보내 연결 유지
+    - 느린 클라이언트: 큐가 차면 가장 오래된 메시지를 버림(항상 전체 상태라 최신만 있으면 됨),
+      max_drops번 연속으로 밀리면 연결을 끊음
+    """
+
+    def __init__(self, source, heartbeat=15.0, min_interval=0.5, queue_size=4, max_drops=100):
+        self.source = source  # current()로 EstimateSnapshot을 돌려주는 객체
+        self.heartbeat = heartbeat
+        self.min_interval = min_interval
+        self.queue_size = queue_size
+        self.max_drops = max_drops
+        self.subscribers = {}  # {queue: 누적 drop 수}
+        self._loop = None
+        self._changed = None
+        self._pending = False
+        self._last_version = None
+        self._last_message = None
+
+    def notify(self, _snap=None):
+        """발행 스레드에서 호출. 이벤트 루프에 깨우기만 예약하고 바로 돌아감"""
+        if self._loop is None or self._pending:
+            return
+        self._pending = True
+        self._loop.call_soon_threadsafe(self._changed.set)
+
+    def _start(self):
+        self._loop = asyncio.get_running_loop()
+        self._changed = asyncio.Event()
+        self._last_message = self._encode(self.source.current())
+        self._loop.create_task(self._pump())
+
+    @staticmethod
+    def _encode(snap):
+        data = json.dumps(snap.to_response(), separators=(",", ":"))
+        return f"id: {snap.version}\nevent: estimate\ndata: {data}\n\n".encode()
+
+    def _fanout(self, message):
+        for q in list(self.subscribers):
+            if q.full():
+                q.get_nowait()
+                self.subscribers[q] += 1
+                if self.subscribers[q] > self.max_drops:
+                    del self.subscribers[q]
+                    q.put_nowait(None)  # 구독자 쪽에서 None을 받으면 종료
+                    continue
+            else:
+                self.subscribers[q] = 0
+            q.put_nowait(message)
+
+    async def _pump(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._changed.wait(), self.heartbeat)
+            except asyncio.TimeoutError:
+                self._fanout(b": ping\n\n")
+                continue
+            self._changed.clear()
+            self._pending = False
+
+            snap = self.source.current()
+            if snap.version != self._last_version:
+                self._last_version = snap.version
+                self._last_message = self._encode(snap)
+                self._fanout(self._last_message)
+            await asyncio.sleep(self.min_interval)
+
+    async def stream(self):
+        if self._loop is None:
+            self._start()
+        q = asyncio.Queue(self.queue_size)
+        self.subscribers[q] = 0
+        try:
+            yield self._last_message  # 접속 직후 현재 값부터
+            while True:
+                message = await q.get()
+                if message is None:
+                    break
+                yield message
+        finally:
+            self.subscribers.pop(q, None)
@@ -1,22 +1,32 @@
-import cv2
-from ultralytics import YOLO
+import os
 import numpy as np
 import time
+from collections import OrderedDict
 from tracker.byte_tracker import BYTETracker # ByteTrack 불러오기
+from yolo.beready_capture import open_capture
+from yolo.beready_estimator import DwellEstimator
+from yolo.beready_persist import SnapshotWriter, dump_tracker, load_tracker, read_snapshot
 import threading
 
 # ----------------- 설정 -----------------
-VIDEO_PATH = "people.mp4" # 카메라 URL 또는 파일 경로
+VIDEO_PATH = os.getenv("BEREADY_TRACKER_VIDEO", "people.mp4") # 카메라 URL 또는 파일 경로
 MODEL_PATH = "yolov8n.pt" # YOLO 모델 파일 경로
 detect_interval = 1 # 몇 프레임마다 detection 실행할지(1이면 매 프레임)
 conf_threshold = 0.2 # 검출 신뢰도 임계값
 scale = 0.5 # 화면 표시 시 축소 비율(성능/표시용)
 max_missed = 150  # 150프레임 미검출 시 사라진 것으로 간주
+min_hits = 10 # 이 프레임 수 미만으로 잡힌 트랙은 오검출로 보고 샘플에서 제외
+dwell_window = 200 # 절사평균에 쓸 최근 샘플 수
+dwell_trim = 0.1 # 절사평균에서 위/아래로 버릴 비율
+snapshot_path = os.getenv("BEREADY_SNAPSHOT_PATH", "tracker_snapshot.json") # 재시작 시 복원할 상태 파일
+snapshot_interval = 10.0 # 몇 초마다 스냅샷을 남길지
+snapshot_max_age = 300.0 # 이보다 오래된 스냅샷은 무시하고 새로 시작(초)
+CAPTURE_KEY = "tracker" # 캡처 통계(/api/lilac/estimation/cameras)에서 추적기 영상을 가리키는 이름
 # ----------------------------------------
 
 # 전역 변수
 wait = 20.0
-current_people_count = 0
+dwell = DwellEstimator(window=dwell_window, trim=dwell_trim, default=wait) # 1인당 처리시간 추정기
 running = False
 
 # 외부에서 wait 값을 가져갈 때 사용
@@ -25,26 +35,31 @@ def get_wait():
 
 # 별도 스레드에서 실행할 추적 루프
 def start_tracker():
-    global wait, current_people_count, running
+    """
+    추론 예산(InferenceBudget)에는 참여하지 않고 원래 속도 그대로 매 프레임 추적.
+    max_missed / min_hits / track_buffer가 모두 프레임 수 기준이라 fps가 우선순위에 따라 낮아지면
+    퇴장 판정이 수십 초씩 늦어지고 프레임 간격이 벌어져 ID가 바뀌므로 체류시간(wait)이 틀어짐
+    """
+    global wait, running
 
     if running:
         print("[INFO] Tracker already running.")
         return
     running = True
 
-    # np.float 호환성 처리
-    if not hasattr(np, "float"):
-        np.float = float
+    import cv2  # 영상/모델은 추적을 실제로 시작할 때만 import (API 워커에서는 불필요)
+    from ultralytics import YOLO
 
-    cap = cv2.VideoCapture(VIDEO_PATH) # cap으로 비디오 스트림 열기
-    if not cap.isOpened():
+    cap = open_capture(VIDEO_PATH, key=CAPTURE_KEY) # 파일이면 순서대로, 스트림이면 최신 프레임만 (끊기면 재연결)
+    if not cap.opened():
         print(f"[ERROR] Cannot open video: {VIDEO_PATH}")
+        cap.release()
         running = False
         return
 
 
          
-    print("Camera opened:", cap.isOpened()) # cap.isOpened()로 성공 여부 확인 가능
+    print("Camera opened:", cap.opened()) # cap.opened()로 성공 여부 확인 가능
     model = YOLO(MODEL_PATH)  # model로 YOLOv8 로드
 
     # ByteTrack 초기 설정값
@@ -59,15 +74,29 @@ def start_tracker():
     tracker = BYTETracker(Args()) # ByteTrack 객체 생성
 
     frame_count = 0 # 프레임 번호
-    target_id = None # 현재 추적중인 대상id (없으면 None)
-    meta = {}  
-    # 각 추적 ID별 메타데이터(처음 본 시각, 마지막으로 본 프레임, 연속 미검출 횟수) # {id: {"first_seen":ts, "last_seen_frame":n, "missed":k}}
+    meta = OrderedDict()
+    # 모든 추적 ID별 메타데이터 # {id: {"first_seen":ts, "last_seen":ts, "last_seen_frame":n, "hits":k, "people_at_entry":c}}
+    # 마지막으로 본 순서대로 정렬을 유지(move_to_end) → 만료 검사는 앞에서부터 꺼내기만 하면 됨
+
+    # 최근 스냅샷이 있으면 이어서 시작 (재배포/크래시 후 wait가 20초로 리셋되는 것 방지)
+    snap = read_snapshot(snapshot_path, snapshot_max_age)
+    if snap:
+        load_tracker(tracker, snap["tracker"])
+        frame_count = snap["frame_count"]
+        meta = OrderedDict((pid, m) for pid, m in snap["meta"])
+        dwell.load(snap["dwell"])
+        wait = dwell.value()
+        print(f"[INFO] Snapshot restored: wait {wait:.2f}초, 추적 ID {len(meta)}개")
+    writer = SnapshotWriter(snapshot_path)
+    last_snapshot = time.time()
 
     while running:
-        ret, frame = cap.read() # cap.read()로 영상에서 프레임을 하나씩 읽음
-        if not ret: # 영상이 끝났거나 읽기 실패 시 종료
-            print("Frame read failed. Stopping.")
-            break
+        frame, captured_at = cap.read() # 파일: 다음 프레임 / 스트림: 아직 안 본 가장 최신 프레임
+        if frame is None:
+            if cap.ended: # 영상이 끝났으면 종료
+                print("Frame read failed. Stopping.")
+                break
+            continue # 스트림 재연결 중
 
         frame_count += 1  # 현재까지 읽은 영상 프레임(장면)의 개수를 세는 카운터 변수
         h, w = frame.shape[:2]  # h,w는 영상 높이/너비 (트래커 업데이트에 사용)
@@ -92,65 +121,58 @@ def start_tracker():
         else:
             online_targets = []
 
-        # -------- tracks 처리 ----------
-        present_ids = set() # 현재 프레임에서 감지된 추적 ID 집합
-        tracks = [] # 시각화 및 ‘맨 뒤 선택’에 사용할 [x1,y1,x2,y2,track_id] 리스트
-
+        # -------- tracks 처리 (모든 ID 동시 기록) ----------
+        now = time.time()
+        people = len(online_targets) # 현재 프레임에 보이는 사람 수
+        if frame_count % detect_interval == 0:
+            cap.record_result(captured_at, now)
         for t in online_targets:
             track_id = t.track_id
-            tlwh = t.tlwh # [x, y, w, h] 형식의 바운딩박스
-            x1, y1, w_box, h_box = map(int, tlwh)
-            x2, y2 = x1 + w_box, y1 + h_box
-            tracks.append([x1, y1, x2, y2, track_id])
-            present_ids.add(track_id)
-
-            # 메타데이터 갱신
-            if track_id not in meta: # 처음 등장한 ID는 첫 시각과 프레임 저장
-                meta[track_id] = {"first_seen": time.time(), "last_seen_frame": frame_count, "missed": 0}
-            else:  # 이미 존재하면 last_seen_frame을 갱신하고 missed를 0으로 초기화
-                meta[track_id]["last_seen_frame"] = frame_count
-                meta[track_id]["missed"] = 0
-
-        # 부재(ID 미검출) 처리
-        for pid in meta.keys():
-            if pid not in present_ids:
-                meta[pid]["missed"] += 1  # 현재 프레임에 존재하지 않은 ID는 연속 미검출 횟수(missed)를 1 증가
-
-        # 사라진 타겟 처리
-        if target_id is not None and target_id in meta and meta[target_id]["missed"] >= max_missed:  # 현재 타겟이 있고 missed가 max_missed(여기선 20) 이상이면
-            disappear_ts = time.time()
-            wait_time = disappear_ts - meta[target_id]["first_seen"]  # 대상이 완전히 사라진 것으로 보고 대기시간 계산(현재 시각 − first_seen)
-            wait = wait_time / current_people_count if current_people_count > 0 else wait_time
-            print(f"[INFO] 대상 {target_id} 사라짐 → 대기시간 {wait_time:.2f}초, wait {wait:.2f}초")
-            del meta[target_id]  # 사라진 사람의 meta 삭제
-            target_id = None  # target_id를 해제
-
-        # 타겟이 아닌 오래된 ID 삭제 (누적 방지)
-        for pid in list(meta.keys()):
-            if meta[pid]["missed"] >= max_missed:
-                del meta[pid]
-
-        # 새로운 타겟 선택
-        if target_id is None and tracks: # 타겟이 없다면 중심 x 좌표가 가장 작은(왼쪽) 사람을 선택하여 target_id로 고정
-            leftmost = min(tracks, key=lambda t: (t[0] + t[2]) / 2)
-            target_id = leftmost[4]
-            current_people_count = len(tracks)  # 현재 프레임에 보이는 사람 수 저장
-            if meta[target_id]["first_seen"] is None:
-                meta[target_id]["first_seen"] = time.time()
-            print(f"[INFO] 새로운 대상 선택: ID={target_id}, 현재 인원수={current_people_count}")
+            m = meta.get(track_id)
+            if m is None: # 처음 등장한 ID는 입장 시각과 그 순간의 인원수 저장
+                meta[track_id] = {"first_seen": now, "last_seen": now, "last_seen_frame": frame_count,
+                                  "hits": 1, "people_at_entry": people}
+            else:  # 이미 존재하면 마지막으로 본 시각/프레임만 갱신하고 맨 뒤로 이동
+                m["last_seen"] = now
+                m["last_seen_frame"] = frame_count
+                m["hits"] += 1
+                meta.move_to_end(track_id)
+
+        # 사라진 ID 처리: max_missed 프레임 동안 안 보인 트랙을 앞에서부터 꺼내 대기시간 샘플로 사용
+        while meta:
+            pid, m = next(iter(meta.items()))
+            if frame_count - m["last_seen_frame"] < max_missed:
+                break
+            del meta[pid]
+            if m["hits"] < min_hits:
+                continue
+            dwell_time = m["last_seen"] - m["first_seen"]  # 입장~마지막으로 보인 시각
+            dwell.add(dwell_time / max(m["people_at_entry"], 1))
+            wait = dwell.value()
+            print(f"[INFO] ID {pid} 퇴장 → 체류 {dwell_time:.2f}초 / 입장 시 {m['people_at_entry']}명, wait {wait:.2f}초")
         """
         # 시각화
-        for x1, y1, x2, y2, tid in tracks:
-            color = (0, 0, 255) if tid == target_id else (0, 255, 0)
-            cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
-            cv2.putText(frame, f"ID {tid}", (x1, y1 - 10),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+        for t in online_targets:
+            x1, y1, w_box, h_box = map(int, t.tlwh)
+            cv2.rectangle(frame, (x1, y1), (x1 + w_box, y1 + h_box), (0, 255, 0), 2)
+            cv2.putText(frame, f"ID {t.track_id}", (x1, y1 - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
 
         cv2.imshow("Queue Tracker", cv2.resize(frame, (0, 0), fx=scale, fy=scale))
         if cv2.waitKey(30) & 0xFF == ord("q"):
             break
         """
 
+        # 주기적 스냅샷: 여기서는 값만 복사하고 파일 쓰기는 writer 스레드가 담당
+        if now - last_snapshot >= snapshot_interval:
+            last_snapshot = now
+            writer.submit({
+                "tracker": dump_tracker(tracker),
+                "frame_count": frame_count,
+                "meta": [[pid, dict(m)] for pid, m in meta.items()],
+                "dwell": dwell.state(),
+            })
+
     cap.release()
     #cv2.destroyAllWindows()
     running = False
@@ -0,0 +1,28 @@
+"""
+추론 전용 프로세스 (카메라 + YOLO + 추적기 + 시계열 기록)
+
+    BEREADY_SHM_PATH=/tmp/estimation.shm python -m yolo.inference_service
+    BEREADY_ROLE=api BEREADY_SHM_PATH=/tmp/estimation.shm uvicorn main:app --workers 4
+
+스냅샷은 BEREADY_SHM_PATH(mmap 파일)에 발행하고, BEREADY_ROLE=api로 띄운 API 워커들이 읽는다.
+API 워커 수와 추론 용량을 따로 늘릴 수 있음. 이 프로세스는 하나만 띄울 것.
+api 역할에서는 식단 크롤링 스케줄러가 기본으로 꺼져 있으므로(워커마다 크롤링 방지)
+python -m crawler_radhaha.beready_scheduler 를 따로 하나만 띄울 것.
+"""
+import os
+import time
+
+os.environ["BEREADY_ROLE"] = "inference"  # main_yolo import 전에 지정
+
+from yolo import main_yolo  # noqa: E402
+
+
+def main():
+    main_yolo.start_yolo_threads()
+    print(f"[INFO] Inference service publishing to {main_yolo.SHM_PATH}")
+    while True:
+        time.sleep(3600)
+
+
+if __name__ == "__main__":
+    main()
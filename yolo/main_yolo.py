@@ -18,19 +18,20 @@ from ultralytics.nn.tasks import DetectionModel
 
 import os
 import threading
-import cv2
-import warnings
-from fastapi import APIRouter
-from ultralytics import YOLO
-import torch
-from torch.nn import Sequential
-from ultralytics.nn.tasks import DetectionModel
-
-from yolo.beready_tracker import get_wait, start_tracker_thread
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from yolo.beready_stream import Broadcaster
+from yolo.beready_history import HistoryStore, TOTAL
+from yolo.beready_forecast import WEEKDAYS, WaitForecast, parse_hhmm, slot_of
+from yolo.beready_shm import ShmReader, ShmSnapshotSource, ShmWriter
+from yolo.beready_capture import capture_stats
 import time
+from typing import List, Optional
 from pydantic import BaseModel
 
-warnings.filterwarnings("ignore", category=FutureWarning)
+import response_cache
+from io_executor import run_blocking
 
 # app = FastAPI()  # FastAPI 객체 생성
 router = APIRouter()  # 라우터 객체 생성
@@ -45,131 +46,181 @@ app.add_middleware(  # CORS (Cross-Origin Resource Sharing) 문제 해결을 위
 )
 """
 
-# 카메라별 사람 수 저장
-camera_counts = [0, 0]  # [카메라1, 카메라2]
-wait_time = 0  # 예상 대기 시간 (분)
-average_counts = []  # 평균 계산용 리스트
-
-PERSON_CLASS_ID = 0  # YOLOv8 모델에서 ID: 0번이 사람
-count_lock = threading.Lock()  # threading.Lock 사용
-model = YOLO("yolov8n.pt")  # YOLOv8 모델 로드
-
-video_paths = [  # 감지할 비디오 파일 경로
+# 실행 역할
+#  all       : 한 프로세스에서 추론 + API (기본, 기존 방식 / uvicorn 워커 1개)
+#  inference : 카메라/모델/기록만 (python -m yolo.inference_service), 스냅샷을 SHM_PATH에 발행
+#  api       : 모델 없이 SHM_PATH의 스냅샷만 읽어 응답 → uvicorn --workers N 가능
+ROLE = os.getenv("BEREADY_ROLE", "all")
+if ROLE not in ("all", "api", "inference"):
+    raise RuntimeError(f"Unknown BEREADY_ROLE: {ROLE}")
+SHM_PATH = os.getenv("BEREADY_SHM_PATH", "estimation.shm")  # 추론 → API 스냅샷 전달 파일
+BUDGET_SHM_PATH = SHM_PATH + ".budget"  # 카메라별 추론 예산 통계 (inference → api)
+QUEUE_OFFSET = int(os.getenv("BEREADY_QUEUE_OFFSET", "3"))  # 대기열에서 뺄 인원(배식/계산 중인 사람)
+WAIT_WINDOW = float(os.getenv("BEREADY_WAIT_WINDOW", "60"))  # 대기열 길이 EWMA 시정수(초)
+HISTORY_DB_PATH = os.getenv("BEREADY_HISTORY_DB", "history.db")  # 인원수/대기시간 시계열 저장 파일
+
+video_paths = [  # 감지할 비디오 파일 경로 (rtsp:// / http:// 스트림 URL이면 최신 프레임만 보는 실시간 모드)
     "people.mp4",  # 카메라1
     "theme park.mp4",  # 카메라2
 ]
-
-
-def detect_people(camera_index, video_path):  # 사람 탐지 함수
-    global camera_counts
-    
-    if not os.path.exists(video_path):
-        print(f"[WARN] Video not found: {video_path}")
-        return
-        
-    cap = cv2.VideoCapture(video_path)  # OpenCV의 VideoCapture 객체를 생성
-    
-    if not cap.isOpened():
-        print(f"[ERROR] Cannot open video: {video_path}")
-        return
-
-    print(f"[INFO] Started detecting on {video_path}")
-
-    while True:  # 무한 루프 시작
-        ret, frame = cap.read()  # cap.read()로 영상에서 프레임을 하나씩 읽음
-        if not ret:  # ret == False이면 루프 종료
-            break
-
-        frame = cv2.resize(frame, (640, 360))  # YOLO 처리 속도 향상을 위해 프레임을 640x360으로 리사이즈
-        results = model(frame, conf=0.2, iou=0.5, max_det=20, verbose=False)[0]  # 프레임을 YOLO 모델에 입력하고, 첫 번째 결과 ([0])를 가져옴
-        # 하이퍼파라미터 #conf(기본 0.25, 낮추면 더 많이 탐지하지만 오탐 증가) # iou(기본 0.7, 낮추면 중복 제거 강하게 적용됨) # max_det(한 프레임에서 최대 탐지 수)
-        person_detections = [box for box in results.boxes if int(box.cls[0]) == PERSON_CLASS_ID]
-
-        with count_lock:  # 사람 수 변경 시
-            camera_counts[camera_index] = len(person_detections)
-            current_wait_time = wait_time  # 임시로 예상대기시간도 표시하기위해 추가
-            
-        """
-        # 디스플레이 (카메라별 개별 창)
-        for box in person_detections:  # 박스 그리기
-            x1, y1, x2, y2 = map(int, box.xyxy[0])  # 경계 상자 좌표
-            conf = float(box.conf[0])  # 신뢰도(확률)
-            cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)  # 프레임에 초록색 박스를 그림
-            cv2.putText(frame, f'Person {conf:.2f}', (x1, y1 - 10),  # 프레임에 라벨을 그림
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
-
-
-        cv2.putText(frame, f'Cam{camera_index + 1}: {camera_counts[camera_index]} | Total: {total_count}', (10, 30),
-                    # 현재 감지된 사람 수를 좌상단에 표시
-                    cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-        # 예상 대기 시간 표시
-        cv2.putText(frame, f'Wait Time: {current_wait_time} min', (10, 70),
-                    cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2)
-        
-        cv2.imshow(f'Camera {camera_index + 1}', frame)  # 프레임을 실시간으로 화면에 표시
-        if cv2.waitKey(1) & 0xFF == 27:  # 사용자가 ESC키를 누르면 루프 종료
-            break
-        """
-        
-        total_count = sum(camera_counts)
-        time.sleep(0.05)  # CPU 점유율 완화
-        
-    cap.release()  # cap 객체가 사용하던 영상 스트림을 종료
-    #cv2.destroyAllWindows()  # OpenCV가 생성한 모든 창(윈도우)을 닫음
-
-
-def calculate_wait_time():  # 예상대기시간을 구하는 함수
-    global wait_time
-    while True:
-        for _ in range(6):
-            with count_lock:
-                total_people = sum(camera_counts)
-                if total_people >= 3:  # 만약 사람이 3명 이상이면 -3을 한다
-                    average_counts.append(total_people - 3)
-                else:
-                    average_counts.append(total_people)
-            time.sleep(10)
-
-        avg = sum(average_counts) / len(average_counts)
-
-        wait_time = round(avg * get_wait() / 60)  # 1명당 20초 # 초를 분으로 바꾸고 반올림함
-
-        average_counts.clear()
-
+if os.getenv("BEREADY_VIDEO_PATHS"):  # 쉼표로 구분, 예: 로컬 대역 스트림(python -m yolo.beready_fake_camera)
+    video_paths = [p.strip() for p in os.environ["BEREADY_VIDEO_PATHS"].split(",") if p.strip()]
+
+if ROLE == "api":
+    # 추론 프로세스가 발행한 스냅샷을 읽기만 함 (ultralytics/torch import 없음)
+    publisher = ShmSnapshotSource(SHM_PATH, len(video_paths))
+    budget_reader = ShmReader(BUDGET_SHM_PATH)
+else:
+    from yolo.beready_tracker import get_wait, start_tracker_thread
+    from yolo.beready_estimator import WaitEstimator
+    from yolo.beready_publish import SnapshotPublisher
+    from yolo.beready_budget import InferenceBudget
+
+    # 카메라들(+추적기)이 나눠 쓰는 초당 추론 횟수 (대기열이 길고 변화가 많은 카메라에 더 많이)
+    budget = InferenceBudget()
+
+    # 예상 대기 시간: 카메라가 인원수를 낼 때마다 바로 갱신 (1인당 처리시간은 tracker의 get_wait)
+    estimator = WaitEstimator(len(video_paths), get_wait, window=WAIT_WINDOW, offset=QUEUE_OFFSET)
+    # 카메라별 사람 수 + 대기시간을 불변 스냅샷으로 발행 (API는 락 없이 읽음)
+    publisher = SnapshotPublisher(estimator)
+
+# 실시간 푸시(SSE): 값이 바뀔 때만 모든 구독자에게 한 번에 전달
+broadcaster = Broadcaster(publisher)
+publisher.subscribe(broadcaster.notify)
+# 인원수/대기시간 기록 (1초 간격 원본 + 1분/5분/15분/1일 집계) - 쓰기는 추론 쪽 한 프로세스만
+history = HistoryStore(HISTORY_DB_PATH)
+# 요일 x 5분 슬롯별 예상 대기시간 (history의 5분 집계에서 증분 갱신 → API 워커마다 DB에서 읽음)
+forecast = WaitForecast(history)
 
 
 # 여기서부턴 Radhaha가 추가함 #
 # ------------------ 추가: 응답 모델 ------------------
 class EstimateResponse(BaseModel):
-    cam1: int
-    cam2: int
+    cams: List[int]  # 카메라별 인원수 (video_paths 순서)
+    cam1: int  # = cams[0] (기존 클라이언트 호환)
+    cam2: int  # = cams[1], 카메라가 1대면 0
     total: int
-    wait_time: int
+    wait_time: int  # 반올림한 분 (기존 클라이언트 호환)
+    wait_minutes: float  # 소수점 분
+    wait_low: float  # 95% 구간 하한(분)
+    wait_high: float  # 95% 구간 상한(분)
+    updated_at: Optional[float] = None  # 마지막 갱신 시각(unix time)
 
 # ----------------------------------------------------
 
+# 스냅샷 version / 대기시간 값이 바뀔 때만 다시 직렬화
+# (updated_at은 매 프레임 바뀌므로 초 단위로만 키에 넣음 → 최대 초당 1번 재직렬화)
+estimation_cache = response_cache.ResponseCache()
+wait_cache = response_cache.ResponseCache()
+
 @router.get("/api/lilac/estimation", response_model=EstimateResponse)
-def get_lilac():
-    with count_lock:
-        return {"cam1": camera_counts[0], "cam2": camera_counts[1],
-                "total": sum(camera_counts), "wait_time": wait_time}
+async def get_lilac(request: Request):
+    snap = publisher.current()
+    key = (snap.version, int(snap.updated_at or 0))
+    return response_cache.respond(request, estimation_cache.get(key, snap.to_response))
+
+@router.get("/api/lilac/estimation/stream")
+async def stream_lilac():
+    """EstimateResponse를 Server-Sent Events로 푸시 (값이 바뀔 때만 + 15초 heartbeat)"""
+    return StreamingResponse(broadcaster.stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@router.get("/api/lilac/estimation/history")
+async def get_lilac_history(start: Optional[float] = None, end: Optional[float] = None,
+                      resolution: Optional[int] = None, camera: int = TOTAL):
+    """start/end는 unix time(초), 기본은 최근 24시간. resolution(60/300/900/86400)을 안 주면 구간 길이로 자동 선택"""
+    if end is None:
+        end = time.time()
+    if start is None:
+        start = end - 86400
+    try:
+        return await run_blocking(history.query, start, end, resolution, camera)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/api/lilac/estimation/forecast")
+async def get_lilac_forecast(at: Optional[str] = None, weekday: Optional[int] = None):
+    """at='12:10'(KST), weekday는 0=월요일~6=일요일 (응답도 같은 숫자 + weekday_name). 생략하면 지금 시각/오늘"""
+    now_wd, now_slot = slot_of(time.time())
+    try:
+        minute = parse_hhmm(at) if at else now_slot * 5
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    wd = now_wd if weekday is None else weekday
+    if not 0 <= wd <= 6:
+        raise HTTPException(status_code=400, detail="weekday must be 0-6")
+    return forecast.lookup(wd, minute)
+
+@router.get("/api/lilac/estimation/forecast/day")
+async def get_lilac_forecast_day(weekday: Optional[int] = None):
+    wd = slot_of(time.time())[0] if weekday is None else weekday
+    if not 0 <= wd <= 6:
+        raise HTTPException(status_code=400, detail="weekday must be 0-6")
+    return {"weekday": wd, "weekday_name": WEEKDAYS[wd], "slots": forecast.day(wd)}
+
+@router.get("/api/lilac/estimation/cameras")
+async def get_lilac_cameras():
+    """카메라별 할당 fps / 실제 fps / 우선순위 (추론 예산 상태) + 캡처 지연/재연결 통계"""
+    stats = budget_reader.read() if ROLE == "api" else camera_stats()
+    if stats is None:
+        raise HTTPException(status_code=503, detail="inference service has not published yet")
+    return stats
 
 @router.get("/wait")
-def get_wait_time():
-    return {"wait": get_wait()}
+async def get_wait_time(request: Request):
+    # api 역할에서는 추적기가 다른 프로세스에 있으므로 스냅샷에 실린 값을 사용
+    wait = publisher.current().service_seconds if ROLE == "api" else get_wait()
+    return response_cache.respond(request, wait_cache.get(wait, lambda: {"wait": wait}))
         
 # 스레드 실행 함수
 def start_yolo_threads():
-    """YOLO 감지 및 추적기 스레드 시작"""
+    """역할에 맞는 백그라운드 스레드 시작 (api: 스냅샷 구독 + 예측표, 그 외: YOLO 감지 및 추적기)"""
     try:
-        start_tracker_thread()  # tracker.py 스레드 실행
+        if ROLE == "api":
+            publisher.start()  # SHM_PATH 감시 → 바뀌면 SSE 구독자에게 알림
+            forecast.start()
+            print(f"[INFO] API role: reading estimation snapshots from {SHM_PATH}")
+            return
+
+        from yolo.beready_detector import detect_people  # ultralytics 로드는 여기서 처음
+
+        start_tracker_thread()  # tracker.py 스레드 실행 (추론 예산과 별개로 매 프레임)
+        history.start(publisher)  # 시계열 기록 스레드
+        if ROLE == "all":
+            forecast.start()  # 예측표 증분 갱신 스레드
+        else:
+            start_shm_publisher()
         for idx, path in enumerate(video_paths):
-            threading.Thread(target=detect_people, args=(idx, path), daemon=True).start()
-        threading.Thread(target=calculate_wait_time, daemon=True).start()
-        print("[INFO] YOLO detection threads started.")
+            threading.Thread(target=detect_people, args=(idx, path, publisher, budget), daemon=True).start()
+        print(f"[INFO] YOLO detection threads started (role={ROLE}).")
     except Exception as e:
         print(f"[ERROR] Failed to start YOLO threads: {e}")
 
+def camera_stats():
+    """추론 예산(카메라별 할당/실제 fps) + 캡처 상태(건너뛴 프레임, 재연결, 수신→결과 지연)"""
+    stats = budget.stats()
+    stats["captures"] = capture_stats()
+    return stats
+
+def start_shm_publisher(heartbeat=1.0):
+    """내용이 바뀔 때마다 + heartbeat초마다(updated_at 갱신) 현재 스냅샷을 SHM_PATH에 기록 (추론 예산 통계도 같이)"""
+    writer = ShmWriter(SHM_PATH)
+    writer.publish(publisher.current())
+    publisher.subscribe(writer.publish)
+    budget_writer = ShmWriter(BUDGET_SHM_PATH)
+
+    def run():
+        while True:
+            time.sleep(heartbeat)
+            try:
+                writer.publish(publisher.current())
+                budget_writer.write(camera_stats())
+            except Exception as e:
+                print(f"[WARN] shm publish failed: {e}")
+
+    threading.Thread(target=run, daemon=True).start()
+    return writer
+
 """
 @app.on_event("startup")  # FastAPI 서버가 실행될 때 한 번 실행되는 이벤트
 def startup_event():